@@ -5,15 +5,14 @@ Usage: python force_rebalance.py <strategy_name>
 Example: python force_rebalance.py vol_regime_weekly
 """
 
-import os
 import sys
 import logging
-import yaml
 from datetime import datetime
-from importlib import import_module
 
 from shared.alpaca_broker import AlpacaBroker
 from shared.data_provider import DataProvider
+from shared.config import load_config, load_credentials
+from shared.strategy_registry import create_strategy
 
 # Setup logging
 logging.basicConfig(
@@ -23,21 +22,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_config():
-    """Load strategy configuration from YAML"""
-    config_path = 'config/strategies.yaml'
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
-
-
 def force_rebalance(strategy_name: str):
     """Force a rebalance for the specified strategy"""
     logger.info(f"Forcing rebalance for: {strategy_name}")
 
     # Load config
-    config = load_config()
     strategy_config = next(
-        (s for s in config['strategies'] if s['name'] == strategy_name),
+        (s for s in load_config() if s.name == strategy_name),
         None
     )
 
@@ -47,26 +38,27 @@ def force_rebalance(strategy_name: str):
 
     try:
         # Create broker
-        account = strategy_config['account']
-        api_key = os.getenv(account['api_key_env'])
-        secret_key = os.getenv(account['secret_key_env'])
-        paper = os.getenv(account.get('paper_env', 'PAPER_TRADING'), 'true').lower() == 'true'
+        account = strategy_config.account
+        creds = load_credentials(
+            strategy_config.name,
+            account.api_key_env,
+            account.secret_key_env,
+            account.paper_env
+        )
 
         broker = AlpacaBroker(
-            api_key=api_key,
-            secret_key=secret_key,
-            paper=paper,
-            strategy_name=strategy_config['name']
+            api_key=creds.api_key,
+            secret_key=creds.secret_key,
+            paper=creds.paper,
+            strategy_name=creds.name,
+            use_fractional=strategy_config.use_fractional
         )
 
         # Create data provider
-        data_provider = DataProvider(api_key, secret_key)
+        data_provider = DataProvider(creds.api_key, creds.secret_key)
 
         # Create strategy
-        module = import_module(strategy_config['module'])
-        strategy_class = getattr(module, strategy_config['class'])
-        rebalance_frequency = strategy_config.get('rebalance_frequency', 'monthly')
-        strategy = strategy_class(broker, data_provider, rebalance_frequency=rebalance_frequency)
+        strategy = create_strategy(strategy_config, broker, data_provider)
 
         # Initialize
         logger.info("Initializing strategy...")
@@ -96,9 +88,8 @@ if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python force_rebalance.py <strategy_name>")
         print("\nAvailable strategies:")
-        config = load_config()
-        for s in config['strategies']:
-            print(f"  - {s['name']}")
+        for s in load_config():
+            print(f"  - {s.name}")
         sys.exit(1)
 
     strategy_name = sys.argv[1]
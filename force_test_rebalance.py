@@ -6,12 +6,15 @@ Run this once to verify everything works, then delete it
 Usage:
     python force_test_rebalance.py --strategy monthly
     python force_test_rebalance.py --strategy weekly
+
+Set FORCE_TEST_YES=1 to skip the confirmation prompt (CI / non-interactive runs)
 """
 
 import os
 import sys
+import time
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Load environment (for local testing)
 try:
@@ -28,11 +31,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from alpaca.trading.enums import QueryOrderStatus
+from alpaca.trading.requests import GetOrdersRequest
+
 from shared.alpaca_broker import AlpacaBroker
 from shared.data_provider import DataProvider
 from strategies.volatility_regime import VolatilityRegimeStrategy
 
 
+def wait_for_orders(broker, submitted_after: datetime, timeout: float = 10.0) -> bool:
+    """
+    Poll until no orders submitted after `submitted_after` are still open
+    Backs off 50ms -> 1s so fast fills return almost immediately
+    Returns: True if all orders closed before the timeout
+    """
+    request = GetOrdersRequest(status=QueryOrderStatus.OPEN, after=submitted_after)
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+
+    while time.monotonic() < deadline:
+        open_orders = broker.trading_client.get_orders(filter=request)
+        if not open_orders:
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+    return False
+
+
+def log_positions(positions):
+    """Log one line per position (each model dumped to a plain dict once)"""
+    for pos in (p.model_dump() for p in positions):
+        logger.info(
+            f"    - {pos['symbol']}: {pos['qty']} shares @ ${float(pos['current_price']):.2f} = "
+            f"${float(pos['market_value']):,.2f}")
+
+
 def force_test_rebalance(strategy_frequency="monthly"):
     """Force a single test rebalance to verify system works"""
     logger.info("=" * 70)
@@ -93,19 +127,21 @@ def force_test_rebalance(strategy_frequency="monthly"):
         # Check current positions
         positions = broker.get_positions()
         logger.info(f"  Current Positions: {len(positions)}")
-        for pos in positions:
-            logger.info(
-                f"    - {pos.symbol}: {pos.qty} shares @ ${float(pos.current_price):.2f} = ${float(pos.market_value):,.2f}")
+        log_positions(positions)
 
-        account = broker.get_account()
-        logger.info(f"  Account Equity: ${float(account.equity):,.2f}")
-        logger.info(f"  Buying Power: ${float(account.buying_power):,.2f}")
+        account = broker.get_account().model_dump()
+        logger.info(f"  Account Equity: ${float(account['equity']):,.2f}")
+        logger.info(f"  Buying Power: ${float(account['buying_power']):,.2f}")
         logger.info("=" * 70)
 
         # Ask for confirmation
         print("\n⚠️  WARNING: This will execute a REAL trade in your paper account!")
         print("=" * 70)
-        confirm = input("\nType 'YES' to proceed with test rebalance: ")
+        if os.getenv('FORCE_TEST_YES') == '1':
+            logger.info("FORCE_TEST_YES=1 set, skipping confirmation prompt")
+            confirm = 'YES'
+        else:
+            confirm = input("\nType 'YES' to proceed with test rebalance: ")
 
         if confirm != 'YES':
             logger.info("Test cancelled by user")
@@ -122,24 +158,23 @@ def force_test_rebalance(strategy_frequency="monthly"):
 
         # Execute trades
         logger.info("\nExecuting trades...")
+        submit_time = datetime.now(timezone.utc)
         strategy.execute_trades(signals)
 
         # Wait for orders to fill
-        logger.info("\nWaiting 5 seconds for orders to fill...")
-        import time
-        time.sleep(5)
+        logger.info("\nWaiting for orders to fill...")
+        if not wait_for_orders(broker, submit_time):
+            logger.warning("Orders still open after timeout - state below may be incomplete")
 
         # Check new positions
         positions = broker.get_positions()
-        account = broker.get_account()
+        account = broker.trading_client.get_account().model_dump()  # bypass the broker's account cache
 
         logger.info("=" * 70)
         logger.info("NEW STATE:")
-        logger.info(f"  Account Equity: ${float(account.equity):,.2f}")
+        logger.info(f"  Account Equity: ${float(account['equity']):,.2f}")
         logger.info(f"  Positions: {len(positions)}")
-        for pos in positions:
-            logger.info(
-                f"    - {pos.symbol}: {pos.qty} shares @ ${float(pos.current_price):.2f} = ${float(pos.market_value):,.2f}")
+        log_positions(positions)
         logger.info("=" * 70)
 
         logger.info("\n✓ TEST REBALANCE COMPLETED!")
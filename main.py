@@ -1,60 +1,80 @@
 # main.py
+import atexit
 import os
+import queue
+import sched
 import time
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import yaml
-from importlib import import_module
 
 from shared.alpaca_broker import AlpacaBroker
 from shared.data_provider import DataProvider
+from shared.config import StrategyConfig, load_config, load_credentials, missing_credentials
 from shared.market_calendar import MarketCalendar
+from shared.strategy_registry import create_strategy
 from shared.email_logger import EmailLogger
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/data/trading.log')
-    ]
-)
-logger = logging.getLogger(__name__)
+# Setup logging - records are queued and written by a background listener thread
+# so strategy/broker threads never block on console or disk I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.StreamHandler(), logging.FileHandler('/data/trading.log')]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
 
+_log_queue = queue.Queue(-1)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)  # flush queued records on exit
 
-def load_config():
-    """Load strategy configuration from YAML"""
-    config_path = 'config/strategies.yaml'
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+logger = logging.getLogger(__name__)
 
+HEARTBEAT_INTERVAL = 30 * 60  # seconds
 
-def create_broker(strategy_config):
-    """Create Alpaca broker instance from config"""
-    account = strategy_config['account']
 
-    api_key = os.getenv(account['api_key_env'])
-    secret_key = os.getenv(account['secret_key_env'])
-    paper = os.getenv(account.get('paper_env', 'PAPER_TRADING'), 'true').lower() == 'true'
-
-    if not api_key or not secret_key:
-        raise ValueError(f"Missing credentials for {strategy_config['name']}")
+def create_broker(strategy_config: StrategyConfig):
+    """Create Alpaca broker instance from config"""
+    account = strategy_config.account
+    creds = load_credentials(
+        strategy_config.name,
+        account.api_key_env,
+        account.secret_key_env,
+        account.paper_env
+    )
 
     return AlpacaBroker(
-        api_key=api_key,
-        secret_key=secret_key,
-        paper=paper,
-        strategy_name=strategy_config['name']
+        api_key=creds.api_key,
+        secret_key=creds.secret_key,
+        paper=creds.paper,
+        strategy_name=creds.name,
+        use_fractional=strategy_config.use_fractional
     )
 
 
-def create_strategy(strategy_config, broker, data_provider):
-    """Create strategy instance from config"""
-    module = import_module(strategy_config['module'])
-    strategy_class = getattr(module, strategy_config['class'])
-    rebalance_frequency = strategy_config.get('rebalance_frequency', 'monthly')
-    return strategy_class(broker, data_provider, rebalance_frequency=rebalance_frequency)
+def init_strategy(strategy_config: StrategyConfig, data_provider):
+    """Create broker and strategy for one config entry, then initialize it"""
+    broker = create_broker(strategy_config)
+    strategy = create_strategy(strategy_config, broker, data_provider)
+    strategy.initialize()
+    broker.warm_up()  # pay TLS handshakes now, not at 3:30 PM
+    return strategy
+
+
+def schedule_recurring(scheduler, job, next_run, priority):
+    """
+    Enqueue job at next_run() and re-enqueue it after every run
+    Errors are logged so one failed run never stops the schedule
+    """
+    def run():
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"Scheduled job {job.__name__} failed: {e}", exc_info=True)
+        scheduler.enterabs(next_run(), priority, run)
+
+    scheduler.enterabs(next_run(), priority, run)
 
 
 def main():
@@ -65,98 +85,104 @@ def main():
 
     # Initialize market calendar (handles timezones)
     market_calendar = MarketCalendar()
-    logger.info(f"Server time: {datetime.now()}")
-    logger.info(f"Market time (ET): {market_calendar.get_market_time()}")
+    logger.info("Server time: %s", datetime.now())
+    logger.info("Market time (ET): %s", market_calendar.get_market_time())
 
     # Initialize email logger
     email_logger = EmailLogger()
 
     # Load configuration
-    config = load_config()
-    strategies_config = [s for s in config['strategies'] if s.get('enabled', False)]
-    logger.info(f"Loaded {len(strategies_config)} enabled strategies")
+    strategies_config = [s for s in load_config() if s.enabled]
+    logger.info("Loaded %d enabled strategies", len(strategies_config))
+
+    # Fail fast with the full list rather than one strategy at a time
+    missing = missing_credentials(strategies_config)
+    if missing:
+        logger.error(f"Missing credential env vars: {', '.join(missing)}")
+        raise SystemExit(f"Missing credential env vars: {', '.join(missing)}")
 
     # Create shared data provider (uses any Alpaca credentials)
     first_strategy = strategies_config[0]
-    data_api_key = os.getenv(first_strategy['account']['api_key_env'])
-    data_secret_key = os.getenv(first_strategy['account']['secret_key_env'])
+    data_api_key = os.getenv(first_strategy.account.api_key_env)
+    data_secret_key = os.getenv(first_strategy.account.secret_key_env)
     data_provider = DataProvider(data_api_key, data_secret_key)
 
-    # Initialize strategies
+    # Initialize strategies concurrently - each pays its own handshakes and history fetch
     strategies = []
-    for config_item in strategies_config:
-        try:
-            broker = create_broker(config_item)
-            strategy = create_strategy(config_item, broker, data_provider)
-            strategy.initialize()
-            strategies.append(strategy)
-            logger.info(f"✓ {strategy.name} initialized successfully")
-            email_logger.add_log(f"✓ {strategy.name} initialized")
-        except Exception as e:
-            logger.error(f"✗ {config_item['name']} initialization failed: {e}")
-            email_logger.add_log(f"✗ {config_item['name']} failed: {e}")
+    with ThreadPoolExecutor(max_workers=min(8, len(strategies_config))) as executor:
+        futures = [
+            (executor.submit(init_strategy, config_item, data_provider), config_item)
+            for config_item in strategies_config
+        ]
+        for future, config_item in futures:  # keep config order
+            try:
+                strategy = future.result()
+                strategies.append(strategy)
+                logger.info("✓ %s initialized successfully", strategy.name)
+                email_logger.add_log(f"✓ {strategy.name} initialized")
+            except Exception as e:
+                logger.error(f"✗ {config_item.name} initialization failed: {e}")
+                email_logger.add_log(f"✗ {config_item.name} failed: {e}")
 
     if not strategies:
         logger.error("No strategies loaded. Exiting.")
         return
 
+    # Exchange holidays come from Alpaca's calendar - any account can serve it
+    market_calendar.load_trading_days(strategies[0].broker.trading_client)
+
+    scheduler = sched.scheduler(time.time, time.sleep)
+
+    def rebalance():
+        market_time = market_calendar.get_market_time()
+        logger.info("=" * 70)
+        logger.info("REBALANCE CHECK: %s", market_time.strftime('%Y-%m-%d %H:%M:%S %Z'))
+        logger.info("=" * 70)
+
+        # Strategies trade independent accounts - run them concurrently
+        with ThreadPoolExecutor(max_workers=len(strategies)) as executor:
+            futures = {executor.submit(strategy.execute): strategy for strategy in strategies}
+            for future in as_completed(futures):
+                strategy = futures[future]
+                try:
+                    executed = future.result()
+                    if executed:
+                        email_logger.add_log(f"{strategy.name}: Rebalanced successfully")
+                    else:
+                        email_logger.add_log(f"{strategy.name}: No rebalance needed")
+                except Exception as e:
+                    logger.error(f"Strategy {strategy.name} error: {e}", exc_info=True)
+                    email_logger.add_log(f"{strategy.name}: ERROR - {e}")
+
+    def heartbeat():
+        market_time = market_calendar.get_market_time()
+        logger.info(
+            "[Heartbeat] Market time: %s | %d strategies active",
+            market_time.strftime('%Y-%m-%d %H:%M:%S %Z'), len(strategies)
+        )
+
+    # Rebalance at 3:30 PM ET on trading days (holidays skipped), email at 5 PM ET, heartbeat every 30 minutes,
+    # drop cached bars at the close so the finished daily bar is refetched
+    schedule_recurring(scheduler, rebalance, market_calendar.next_rebalance_epoch, priority=1)
+    schedule_recurring(scheduler, email_logger.send_daily_summary, market_calendar.next_email_epoch, priority=2)
+    schedule_recurring(scheduler, heartbeat, lambda: time.time() + HEARTBEAT_INTERVAL, priority=3)
+    schedule_recurring(
+        scheduler, data_provider.clear_cache,
+        lambda: market_calendar.next_epoch_at(market_calendar.market_close), priority=4
+    )
+    heartbeat()
+
+    next_rebalance = datetime.fromtimestamp(market_calendar.next_rebalance_epoch(), market_calendar.market_tz)
     logger.info("=" * 70)
-    logger.info(f"{len(strategies)} strategies ready")
-    logger.info("Checking for rebalancing opportunities every minute...")
-    logger.info("Target execution time: 3:30 PM ET (month-end)")
+    logger.info("%d strategies ready", len(strategies))
+    logger.info("Next rebalance check: %s", next_rebalance.strftime('%Y-%m-%d %H:%M:%S %Z'))
     logger.info("=" * 70)
 
-    # Track last execution date for daily email
-    last_email_date = None
-
-    # Main loop - check every minute
-    iteration = 0
-    while True:
-        try:
-            iteration += 1
-            market_time = market_calendar.get_market_time()
-
-            # Heartbeat every 30 minutes
-            if iteration % 30 == 1:
-                logger.info(
-                    f"[Heartbeat] Market time: {market_time.strftime('%Y-%m-%d %H:%M:%S %Z')} | "
-                    f"{len(strategies)} strategies active"
-                )
-
-            # Check if it's time to execute (3:30 PM ET on trading days)
-            if market_calendar.is_time_to_rebalance():
-                logger.info("=" * 70)
-                logger.info(f"REBALANCE CHECK: {market_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                logger.info("=" * 70)
-
-                for strategy in strategies:
-                    try:
-                        executed = strategy.execute()
-                        if executed:
-                            email_logger.add_log(f"{strategy.name}: Rebalanced successfully")
-                        else:
-                            email_logger.add_log(f"{strategy.name}: No rebalance needed")
-                    except Exception as e:
-                        logger.error(f"Strategy {strategy.name} error: {e}", exc_info=True)
-                        email_logger.add_log(f"{strategy.name}: ERROR - {e}")
-
-            # Send daily email at 5 PM ET
-            if market_time.hour == 17 and market_time.minute == 0:
-                today = market_time.date()
-                if last_email_date != today:
-                    email_logger.send_daily_summary()
-                    last_email_date = today
-
-            # Sleep until next minute
-            time.sleep(market_calendar.time_until_next_check())
-
-        except KeyboardInterrupt:
-            logger.info("Shutting down trading system...")
-            email_logger.send_daily_summary(subject="Trading System Shutdown")
-            break
-        except Exception as e:
-            logger.error(f"Main loop error: {e}", exc_info=True)
-            time.sleep(60)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        logger.info("Shutting down trading system...")
+        email_logger.send_daily_summary(subject="Trading System Shutdown")
 
 
 if __name__ == "__main__":
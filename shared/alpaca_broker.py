@@ -1,13 +1,121 @@
 # shared/alpaca_broker.py
+from alpaca.common.exceptions import APIError
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce, OrderStatus
+from alpaca.trading.stream import TradingStream
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockLatestQuoteRequest
 from alpaca.data.enums import DataFeed
-import logging
-from typing import Optional
+from requests import Session
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import numpy as np
+import random
+import threading
+from typing import Dict, List, Optional
 import time
+import uuid
+
+from shared.loggers import get_logger
+
+try:
+    import orjson  # Rust JSON parser, optional speed-up for API responses
+except ImportError:
+    orjson = None
+
+
+# Alpaca caps multi-symbol market data requests at 100 symbols
+MAX_QUOTE_SYMBOLS = 100
+
+# Weight drift below which a position is left alone (0.1% of equity)
+REBALANCE_TOLERANCE = 0.001
+
+# Transient HTTP statuses worth retrying (rate limit, gateway errors)
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+MAX_RETRY_DELAY = 60.0
+
+# Keep-alive HTTP sessions shared by every broker on the same account
+# Key: (api_key, paper) -> Session serving both the trading and data hosts
+_SESSION_CACHE = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """Make response.json() parse with orjson instead of the stdlib json module"""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
+def _get_or_create_session(api_key: str, paper: bool) -> Session:
+    """
+    Return the pooled keep-alive session for an account
+    Reusing one session skips the TCP + TLS handshake on every request
+    """
+    key = (api_key, paper)
+    with _SESSION_LOCK:
+        session = _SESSION_CACHE.get(key)
+        if session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=3)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "Connection": "keep-alive",
+                "Keep-Alive": "timeout=90, max=1000",
+            })
+            if orjson is not None:
+                session.hooks["response"].append(_orjson_response_hook)
+            _SESSION_CACHE[key] = session
+        return session
+
+
+def _retry_delay(error: APIError, attempt: int) -> float:
+    """Seconds to wait before retrying - the rate-limit reset header wins over backoff"""
+    response = getattr(error, 'response', None)
+    reset = response.headers.get('X-Ratelimit-Reset') if response is not None else None
+    if reset:
+        try:
+            return min(MAX_RETRY_DELAY, max(0.0, float(reset) - time.time()) + random.random() * 0.5)
+        except ValueError:
+            pass
+    return min(MAX_RETRY_DELAY, 2 ** attempt + random.random() * 0.5)
+
+
+def ttl_cached(ttl: float):
+    """
+    Cache a no-argument broker method per instance for `ttl` seconds
+    Exceptions are not cached; clear entries early with self._invalidate(name)
+    """
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self):
+            with self._ttl_lock:
+                entry = self._ttl_cache.get(name)
+                if entry is not None and time.monotonic() < entry[0]:
+                    return entry[1]
+
+            value = method(self)
+            with self._ttl_lock:
+                self._ttl_cache[name] = (time.monotonic() + ttl, value)
+            return value
+
+        return wrapper
+    return decorator
+
+
+_IEX_FEED = DataFeed.IEX  # resolved once, not per request
+
+
+@functools.lru_cache(maxsize=1024)
+def _quote_request(symbols: tuple) -> StockLatestQuoteRequest:
+    """
+    Build the IEX latest-quote request for a sorted symbol tuple once
+    Skips re-running pydantic validation on every price lookup
+    """
+    return StockLatestQuoteRequest(symbol_or_symbols=list(symbols), feed=_IEX_FEED)
 
 
 class AlpacaBroker:
@@ -16,43 +124,206 @@ class AlpacaBroker:
     """
 
     def __init__(self, api_key: str, secret_key: str, paper: bool = True,
-                 strategy_name: str = "Strategy", use_fractional: bool = True):
+                 strategy_name: str = "Strategy", use_fractional: bool = True,
+                 keepalive_interval: float = 60.0, use_trade_stream: bool = True):
         self.api_key = api_key
         self.secret_key = secret_key
         self.paper = paper
         self.strategy_name = strategy_name
         self.use_fractional = use_fractional  # ← NEW
-        self.logger = logging.getLogger(f"Broker-{strategy_name}")
+        self.logger = get_logger(f"Broker-{strategy_name}")
 
         # Initialize clients
         self.trading_client = TradingClient(api_key, secret_key, paper=paper)
         self.data_client = StockHistoricalDataClient(api_key, secret_key)
 
+        # Worker pool for overlapping independent API calls
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"broker-{strategy_name}")
+
+        # Short-lived read cache for @ttl_cached methods: {method: (expires_at, value)}
+        self._ttl_cache = {}
+        self._ttl_lock = threading.Lock()
+
+        # Trade-updates WebSocket (started on first liquidation) signals closures without polling
+        self.use_trade_stream = use_trade_stream
+        self._trade_stream = None
+        self._trade_stream_lock = threading.Lock()
+        self._closure_events = {}  # symbol -> threading.Event set when its closing order is done
+
+        # Share one pooled keep-alive session across clients and brokers
+        session = _get_or_create_session(api_key, paper)
+        self.trading_client._session = session
+        self.data_client._session = session
+
+        # _retry is the only retry policy - the SDK's own 429/504 retry (3 x 3s sleeps)
+        # would otherwise multiply attempts and run before X-Ratelimit-Reset is honoured
+        self.trading_client._retry = 0
+        self.data_client._retry = 0
+
         # Verify connection
         try:
-            account = self.get_account()
+            equity = self.get_equity()
             account_type = "Paper" if paper else "Live"
             fractional_status = "with fractional shares" if use_fractional else "whole shares only"
             self.logger.info(
-                f"Connected to Alpaca ({account_type}) - "
-                f"Equity: ${float(account.equity):,.2f} - "
-                f"Using IEX feed (Basic tier) - {fractional_status}"
+                "Connected to Alpaca (%s) - Equity: $%.2f - Using IEX feed (Basic tier) - %s",
+                account_type, equity, fractional_status
             )
         except Exception as e:
             self.logger.error(f"Failed to connect to Alpaca: {e}")
             raise
 
+        # Alpaca drops idle connections after ~90s - ping to keep the socket warm
+        self.keepalive_interval = keepalive_interval
+        self._keepalive_stop = threading.Event()
+        if keepalive_interval:
+            self._keepalive_thread = threading.Thread(
+                target=self._keepalive_loop,
+                name=f"keepalive-{strategy_name}",
+                daemon=True
+            )
+            self._keepalive_thread.start()
+
+    def _keepalive_loop(self):
+        """Periodically hit the API so pooled connections are never cold"""
+        while not self._keepalive_stop.wait(self.keepalive_interval):
+            self.warm_up()
+
+    def warm_up(self):
+        """
+        Touch both the trading and market-data hosts so their pooled connections
+        are open before the first rebalance order
+        Failures are harmless - the next real request just pays the handshake
+        """
+        try:
+            self.trading_client.get_account()
+            self.data_client.get_stock_latest_quote(_quote_request(('SPY',)))
+        except Exception as e:
+            self.logger.debug("Warm-up ping failed: %s", e)
+
+    def close(self):
+        """Stop the keep-alive thread, trade stream and worker pool"""
+        self._keepalive_stop.set()
+        self._pool.shutdown(wait=False)
+        if self._trade_stream is not None:
+            try:
+                self._trade_stream.stop()
+            except Exception as e:
+                self.logger.debug("Trade stream stop failed: %s", e)
+
+    def _ensure_trade_stream(self):
+        """Start the trade-updates stream in a background thread (once)"""
+        if not self.use_trade_stream:
+            return
+
+        with self._trade_stream_lock:
+            if self._trade_stream is not None:
+                return
+            try:
+                stream = TradingStream(self.api_key, self.secret_key, paper=self.paper)
+                stream.subscribe_trade_updates(self._on_trade_update)
+            except Exception as e:
+                self.logger.warning("Trade stream unavailable, polling positions instead: %s", e)
+                self.use_trade_stream = False
+                return
+
+            self._trade_stream = stream
+            threading.Thread(
+                target=self._run_trade_stream,
+                name=f"trade-stream-{self.strategy_name}",
+                daemon=True
+            ).start()
+
+    def _run_trade_stream(self):
+        try:
+            self._trade_stream.run()
+        except Exception as e:
+            self.logger.warning("Trade stream stopped, polling positions instead: %s", e)
+
+    def _trade_stream_connected(self) -> bool:
+        """True once the stream has authenticated and subscribed"""
+        return self._trade_stream is not None and getattr(self._trade_stream, '_running', False)
+
+    async def _on_trade_update(self, update):
+        """
+        Wake closure waiters when an order for a watched symbol is done
+        Any side - closing a short is a buy; only symbols being liquidated are watched
+        """
+        event = getattr(update.event, 'value', update.event)
+        order = update.order
+        if event in ('fill', 'canceled', 'rejected', 'expired'):
+            closure = self._closure_events.get(order.symbol)
+            if closure is not None:
+                closure.set()
+
+    def _retry(self, fn, *args, retries: int = 5, **kwargs):
+        """
+        Call fn, retrying 429/5xx APIErrors with exponential backoff and jitter
+        Any other error (including 404) is raised immediately
+        """
+        for attempt in range(retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except APIError as e:
+                if attempt == retries or e.status_code not in RETRY_STATUS_CODES:
+                    raise
+                delay = _retry_delay(e, attempt)
+                self.logger.warning(
+                    "%s returned %s, retrying in %.1fs (%d/%d)",
+                    fn.__name__, e.status_code, delay, attempt + 1, retries
+                )
+                time.sleep(delay)
+
+    def _submit_order(self, order_data: MarketOrderRequest):
+        """
+        Submit with retries - order_data carries a client_order_id, so if an attempt
+        that errored was actually accepted the retry is rejected instead of doubling the order
+        """
+        try:
+            return self._retry(self.trading_client.submit_order, order_data)
+        except APIError as e:
+            if e.status_code != 422:
+                raise
+            try:
+                return self.trading_client.get_order_by_client_id(order_data.client_order_id)
+            except APIError:
+                raise e
+
+    def _invalidate(self, *names: str):
+        """Drop cached results of the given @ttl_cached methods"""
+        with self._ttl_lock:
+            for name in names:
+                self._ttl_cache.pop(name, None)
+
+    def _positions_changed(self):
+        """Called after any order or close - positions and weights are stale"""
+        self._invalidate('_fetch_positions', '_portfolio_weights')
+
     def get_account(self):
-        """Get account information"""
-        return self.trading_client.get_account()
+        """Get account information (cached for 5s)"""
+        return self._get_cached_account()[0]
+
+    def get_equity(self) -> float:
+        """Account equity as a float - converted once per account fetch"""
+        return self._get_cached_account()[1]
+
+    @ttl_cached(5.0)
+    def _get_cached_account(self):
+        """Return (account, equity) - equity barely moves within one rebalance"""
+        account = self._retry(self.trading_client.get_account)
+        return account, float(account.equity)
 
     def get_positions(self):
-        """Get all current positions"""
+        """Get all current positions (cached for 2s)"""
         try:
-            return self.trading_client.get_all_positions()
+            return self._fetch_positions()
         except:
             return []
 
+    @ttl_cached(2.0)
+    def _fetch_positions(self):
+        return self._retry(self.trading_client.get_all_positions)
+
     def get_position(self, symbol: str):
         """Get specific position"""
         try:
@@ -67,49 +338,100 @@ class AlpacaBroker:
         Example: {'UPRO': 1.0} or {'SPY': 0.6, 'SH': 0.4}
         """
         try:
-            positions = self.get_positions()
-            account = self.get_account()
-            equity = float(account.equity)
+            return dict(self._portfolio_weights())
+        except Exception as e:
+            self.logger.error(f"Failed to get portfolio weights: {e}")
+            return {}
 
-            if not positions or equity <= 0:
-                return {}
+    @ttl_cached(2.0)
+    def _portfolio_weights(self) -> dict:
+        positions = self.get_positions()
+        equity = self.get_equity()
 
-            weights = {}
-            for pos in positions:
-                symbol = pos.symbol
-                position_value = float(pos.market_value)
-                weight = position_value / equity
-                if weight > 0.001:  # Only include positions > 0.1%
-                    weights[symbol] = weight
+        if not positions or equity <= 0:
+            return {}
 
-            return weights
+        symbols = [pos.symbol for pos in positions]
+        market_values = np.array([pos.market_value for pos in positions], dtype=np.float64)  # API sends strings
+        weights = market_values / equity
+        keep = np.flatnonzero(weights > 0.001)  # Only include positions > 0.1%
 
-        except Exception as e:
-            self.logger.error(f"Failed to get portfolio weights: {e}")
-            return {}
+        return dict(zip([symbols[i] for i in keep], weights[keep].tolist()))
 
     def liquidate_position(self, symbol: str):
         """Close a specific position"""
-        try:
-            position = self.get_position(symbol)
-            if not position:
-                self.logger.debug(f"No position to liquidate for {symbol}")
-                return
+        self.liquidate_all_symbols([symbol])
 
-            self.trading_client.close_position(symbol)
-            self.logger.info(f"Liquidated {symbol}")
+    def liquidate_all_symbols(self, symbols: List[str]):
+        """
+        Close several positions concurrently, then wait once for all of them
+        Returns once every closed position is gone (wash trade guard before buying)
+        """
+        if not symbols:
+            return
 
-            # Wait for order to complete
-            self._wait_for_position_closure(symbols=[symbol])
+        # Register for the fill events before any order can complete
+        self._ensure_trade_stream()
+        for symbol in symbols:
+            self._closure_events[symbol] = threading.Event()
 
-        except Exception as e:
-            self.logger.error(f"Failed to liquidate {symbol}: {e}")
-            raise
+        try:
+            futures = {symbol: self._pool.submit(self._close_position, symbol) for symbol in symbols}
+
+            closing = []
+            first_error = None
+            for symbol, future in futures.items():
+                try:
+                    if future.result():
+                        closing.append(symbol)
+                except Exception as e:
+                    self.logger.error(f"Failed to liquidate {symbol}: {e}")
+                    first_error = first_error or e
+
+            # Wait for order to complete - one poll loop for the whole batch
+            if closing:
+                self._wait_for_position_closure(symbols=closing)
+
+            if first_error is not None:
+                raise first_error
+        finally:
+            for symbol in symbols:
+                self._closure_events.pop(symbol, None)
+
+    def _close_position(self, symbol: str) -> bool:
+        """
+        Submit the closing order; False if there was no position to close
+        True means the caller must wait for the closure
+        """
+        attempts = 0
+
+        def close_position(sym):
+            nonlocal attempts
+            attempts += 1
+            return self.trading_client.close_position(sym)
+
+        try:
+            self._retry(close_position, symbol)
+        except APIError as e:
+            if e.status_code != 404:
+                raise
+            if attempts > 1:
+                # An attempt that errored may still have been accepted - its order can be open
+                self.logger.warning("Close of %s may have gone through before a retry, waiting for it", symbol)
+                self._positions_changed()
+                return True
+            self.logger.debug("No position to liquidate for %s", symbol)  # cheaper than checking first
+            return False
+
+        self._positions_changed()
+        self.logger.info("Liquidated %s", symbol)
+        return True
 
     def liquidate_all(self):
         """Close all positions and wait for orders to complete"""
         try:
             self.trading_client.close_all_positions(cancel_orders=True)
+            self._positions_changed()
             self.logger.info("Liquidation initiated, waiting for orders to complete...")
 
             # Wait for all liquidation orders to complete to avoid wash trade detection
@@ -120,22 +442,38 @@ class AlpacaBroker:
             self.logger.error(f"Liquidation error: {e}")
             raise
 
-    def _wait_for_position_closure(self, symbols: list = None, max_wait_seconds: int = 30, check_interval: float = 0.5):
+    def _wait_for_position_closure(self, symbols: list = None, max_wait_seconds: int = 30, check_interval: float = 0.5,
+                                   stream_wait_seconds: float = 5.0):
         """
         Wait for liquidation orders to complete
         Prevents wash trade detection by ensuring positions are fully closed
         before placing new orders
 
+        When the trade-updates stream is connected, first waits (up to stream_wait_seconds)
+        for the sell fills to be pushed; positions are always confirmed over REST,
+        polling for the rest of max_wait_seconds if a fill event was missed
+
         Args:
             symbols: List of symbols to wait for closure. If None, waits for all positions.
             max_wait_seconds: Max time to wait before timeout
             check_interval: How often to check position status
+            stream_wait_seconds: Max time to wait for fill events before polling
         """
         start_time = time.time()
 
-        while time.time() - start_time < max_wait_seconds:
+        if symbols is not None and self._trade_stream_connected():
+            stream_deadline = start_time + min(stream_wait_seconds, max_wait_seconds)
+            for symbol in symbols:
+                closure = self._closure_events.get(symbol)
+                if closure is not None:
+                    closure.wait(max(0.0, stream_deadline - time.time()))
+
+        # Always check REST at least once, even if the stream wait used up the budget
+        first_check = True
+        while first_check or time.time() - start_time < max_wait_seconds:
+            first_check = False
             try:
-                positions = self.get_positions()
+                positions = self.trading_client.get_all_positions()  # uncached - state is changing
                 current_symbols = {pos.symbol for pos in positions}
 
                 # Determine what we're waiting for
@@ -148,39 +486,53 @@ class AlpacaBroker:
                     # Waiting for specific symbols to close
                     remaining = current_symbols & set(symbols)
                     if not remaining:
-                        self.logger.info(f"Positions closed for {symbols}")
+                        self.logger.info("Positions closed for %s", symbols)
                         return
 
                 time.sleep(check_interval)
 
             except Exception as e:
-                self.logger.warning(f"Error checking positions: {e}")
+                self.logger.warning("Error checking positions: %s", e)
                 time.sleep(check_interval)
 
         # Timeout - log warning but continue
+        self._positions_changed()
         remaining_positions = self.get_positions()
         if remaining_positions:
             self.logger.warning(
-                f"Timeout waiting for position closure. Still have {len(remaining_positions)} positions. "
-                f"Proceeding anyway, but wash trade errors may occur."
+                "Timeout waiting for position closure. Still have %d positions. "
+                "Proceeding anyway, but wash trade errors may occur.",
+                len(remaining_positions)
             )
 
     def get_current_price(self, symbol: str) -> Optional[float]:
         """
         Get current ask price using IEX feed (free with Basic tier)
         """
-        try:
-            request = StockLatestQuoteRequest(
-                symbol_or_symbols=symbol,
-                feed=DataFeed.IEX  # ← Add this
-            )
-            quote = self.data_client.get_stock_latest_quote(request)
-            return float(quote[symbol].ask_price)
-        except Exception as e:
-            self.logger.error(f"Failed to get price for {symbol}: {e}")
-            return None
+        return self.get_current_prices([symbol]).get(symbol)
 
-    def set_holdings(self, symbol: str, target_weight: float):
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Get current ask prices for several symbols in one IEX quote request
+        (one request per MAX_QUOTE_SYMBOLS symbols)
+        Symbols without a quote are left out of the result
+        """
+        # Sorted and deduplicated so the same symbol set always reuses its cached request
+        symbols = sorted(set(symbols))
+        prices = {}
+
+        for i in range(0, len(symbols), MAX_QUOTE_SYMBOLS):
+            chunk = tuple(symbols[i:i + MAX_QUOTE_SYMBOLS])
+            try:
+                quotes = self._retry(self.data_client.get_stock_latest_quote, _quote_request(chunk))
+                prices.update({s: float(quotes[s].ask_price) for s in chunk if s in quotes})
+            except Exception as e:
+                self.logger.error(f"Failed to get prices for {list(chunk)}: {e}")
+
+        return prices
+
+    def set_holdings(self, symbol: str, target_weight: float, price: Optional[float] = None,
+                     current_weight: Optional[float] = None, tol: float = REBALANCE_TOLERANCE):
         """
         Set position to target weight of portfolio
         Supports fractional shares for better capital utilization
@@ -188,57 +540,109 @@ class AlpacaBroker:
         Args:
             symbol: Stock symbol
             target_weight: 0.0 to 1.0 (e.g., 0.5 = 50% of portfolio)
+            price: Already-fetched quote for symbol (skips the quote request)
+            current_weight: Already-known weight of symbol - no-op if within tol of target
+            tol: Allowed drift before an order is placed
         """
-        account = self.get_account()
-        equity = float(account.equity)
+        if current_weight is not None and abs(current_weight - target_weight) <= tol:
+            self.logger.debug("%s already at %.2f%% (target %.2f%%), skipping", symbol,
+                              current_weight * 100, target_weight * 100)
+            return None
+
+        if price is not None:
+            return self._submit_one(symbol, self.get_equity() * target_weight, price)
+
+        # Account and quote are independent - fetch them concurrently
+        equity_future = self._pool.submit(self.get_equity)
+        price_future = self._pool.submit(self.get_current_price, symbol)
+
+        equity = equity_future.result()
         target_value = equity * target_weight
+        current_price = price_future.result()
+
+        return self._submit_one(symbol, target_value, current_price)
 
-        current_price = self.get_current_price(symbol)
+    def set_holdings_batch(self, targets: Dict[str, float], prices: Optional[Dict[str, float]] = None,
+                           current_weights: Optional[Dict[str, float]] = None,
+                           tol: float = REBALANCE_TOLERANCE) -> list:
+        """
+        Set several positions to target weights in one pass
+        One account fetch + one quote request, then orders are dispatched concurrently
+
+        Args:
+            targets: {symbol: target_weight}
+            prices: Already-fetched quotes {symbol: price} (skips the quote request)
+            current_weights: Already-known weights - symbols within tol of target are skipped
+            tol: Allowed drift before an order is placed
+        Returns: list of submitted orders (None where skipped)
+        """
+        if current_weights is not None:
+            targets = {
+                symbol: weight for symbol, weight in targets.items()
+                if abs(current_weights.get(symbol, 0.0) - weight) > tol
+            }
 
+        if not targets:
+            return []
+
+        equity_future = self._pool.submit(self.get_equity)
+        if prices is None:
+            prices = self.get_current_prices(list(targets))
+        equity = equity_future.result()
+
+        futures = [
+            self._pool.submit(self._submit_one, symbol, equity * weight, prices.get(symbol))
+            for symbol, weight in targets.items()
+        ]
+        return [future.result() for future in futures]
+
+    def _submit_one(self, symbol: str, target_value: float, current_price: Optional[float]):
+        """Place a single order for target_value dollars of symbol"""
         if current_price is None or current_price <= 0:
             self.logger.error(f"Invalid price for {symbol}, skipping order")
-            return
+            return None
 
         if self.use_fractional:
             # Use notional (dollar amount) order - Alpaca handles fractional shares
-            self._place_notional_order(symbol, target_value)
+            return self._place_notional_order(symbol, target_value, current_price)
         else:
             # Use traditional quantity order (whole shares only)
-            self._place_quantity_order(symbol, target_value, current_price)
+            return self._place_quantity_order(symbol, target_value, current_price)
 
-    def _place_notional_order(self, symbol: str, target_value: float):
+    def _place_notional_order(self, symbol: str, target_value: float, current_price: Optional[float] = None):
         """
         Place order by dollar amount (supports fractional shares)
         This uses ALL available capital efficiently
+        current_price is only needed for the whole-share fallback
         """
         if target_value < 1.0:
-            self.logger.warning(f"Target value ${target_value:.2f} too small for {symbol}")
+            self.logger.warning("Target value $%.2f too small for %s", target_value, symbol)
             return
 
         try:
-            from alpaca.trading.requests import MarketOrderRequest
-            from alpaca.trading.enums import OrderSide, TimeInForce
-
             order_data = MarketOrderRequest(
                 symbol=symbol,
                 notional=round(target_value, 2),  # ← Order by dollar amount
                 side=OrderSide.BUY,
-                time_in_force=TimeInForce.DAY
+                time_in_force=TimeInForce.DAY,
+                client_order_id=uuid.uuid4().hex
             )
 
-            order = self.trading_client.submit_order(order_data)
+            order = self._submit_order(order_data)
+            self._positions_changed()
             self.logger.info(
-                f"Order placed: ${target_value:,.2f} of {symbol} (fractional shares enabled)"
+                "Order placed: $%.2f of %s (fractional shares enabled)", target_value, symbol
             )
             return order
 
         except Exception as e:
             self.logger.error(f"Fractional order failed for {symbol}: {e}")
             self.logger.info("Falling back to whole shares...")
-            # Fallback to whole shares
-            current_price = self.get_current_price(symbol)
+            # Fallback to whole shares - reuse the quote we already have
+            if current_price is None:
+                current_price = self.get_current_price(symbol)
             if current_price:
-                self._place_quantity_order(symbol, target_value, current_price)
+                return self._place_quantity_order(symbol, target_value, current_price)
 
     def _place_quantity_order(self, symbol: str, target_value: float, current_price: float):
         """
@@ -253,16 +657,18 @@ class AlpacaBroker:
                     symbol=symbol,
                     qty=qty,
                     side=OrderSide.BUY,
-                    time_in_force=TimeInForce.DAY
+                    time_in_force=TimeInForce.DAY,
+                    client_order_id=uuid.uuid4().hex
                 )
-                order = self.trading_client.submit_order(order_data)
+                order = self._submit_order(order_data)
+                self._positions_changed()
 
                 actual_value = qty * current_price
                 unused_cash = target_value - actual_value
 
                 self.logger.info(
-                    f"Order placed: {qty} shares of {symbol} @ ${current_price:.2f} = ${actual_value:,.2f} "
-                    f"(${unused_cash:.2f} cash unused)"
+                    "Order placed: %d shares of %s @ $%.2f = $%.2f ($%.2f cash unused)",
+                    qty, symbol, current_price, actual_value, unused_cash
                 )
                 return order
 
@@ -271,6 +677,6 @@ class AlpacaBroker:
                 raise
         else:
             self.logger.warning(
-                f"Calculated qty=0 for {symbol} "
-                f"(price: ${current_price:.2f}, target: ${target_value:.2f})"
+                "Calculated qty=0 for %s (price: $%.2f, target: $%.2f)",
+                symbol, current_price, target_value
             )
\ No newline at end of file
@@ -0,0 +1,61 @@
+# shared/alpaca_broker_async.py
+import asyncio
+from typing import Dict, List, Optional
+
+from shared.alpaca_broker import AlpacaBroker
+from shared.loggers import get_logger
+
+
+class AsyncAlpacaBroker:
+    """
+    asyncio interface over an AlpacaBroker for fanning out many calls at once
+    Each call runs the synchronous SDK in a worker thread over the broker's
+    pooled keep-alive session, so auth, order building and fallbacks stay in
+    AlpacaBroker
+    """
+
+    def __init__(self, broker: AlpacaBroker, max_concurrency: int = 5):
+        self.broker = broker
+        self.logger = get_logger(f"AsyncBroker-{broker.strategy_name}")
+        # Stay under Alpaca's burst rate limit
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _call(self, func, *args, **kwargs):
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def get_current_price(self, symbol: str) -> Optional[float]:
+        """Get current ask price"""
+        return await self._call(self.broker.get_current_price, symbol)
+
+    async def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Get current ask prices in one batched request"""
+        return await self._call(self.broker.get_current_prices, symbols)
+
+    async def get_position(self, symbol: str):
+        """Get specific position"""
+        return await self._call(self.broker.get_position, symbol)
+
+    async def liquidate_position(self, symbol: str):
+        """Close a specific position"""
+        return await self._call(self.broker.liquidate_position, symbol)
+
+    async def set_holdings(self, symbol: str, target_weight: float, price: Optional[float] = None,
+                           current_weight: Optional[float] = None):
+        """Set position to target weight of portfolio (no-op if current_weight is within tolerance)"""
+        return await self._call(self.broker.set_holdings, symbol, target_weight, price, current_weight)
+
+    async def execute_trades_async(self, target: Dict[str, float]) -> list:
+        """
+        Submit orders for every {symbol: target_weight} concurrently
+        Quotes for all symbols are fetched once up front
+        Returns: list of orders in target order (None where skipped)
+        """
+        if not target:
+            return []
+
+        prices = await self.get_current_prices(list(target))
+        return await asyncio.gather(*(
+            self.set_holdings(symbol, weight, prices.get(symbol))
+            for symbol, weight in target.items()
+        ))
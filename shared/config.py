@@ -0,0 +1,104 @@
+# shared/config.py
+import functools
+import os
+from dataclasses import dataclass, fields
+from typing import Iterable, List, Optional, Tuple
+import yaml
+
+CONFIG_PATH = 'config/strategies.yaml'
+
+# libyaml-backed loader is ~10x faster than the pure-Python one
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@dataclass(frozen=True, slots=True)
+class AccountConfig:
+    """Names of the env vars holding one Alpaca account's credentials"""
+    api_key_env: str
+    secret_key_env: str
+    paper_env: str = 'PAPER_TRADING'
+
+
+@dataclass(frozen=True, slots=True)
+class StrategyConfig:
+    """One entry of config/strategies.yaml"""
+    name: str
+    module: str
+    class_name: str
+    account: AccountConfig
+    enabled: bool = False
+    rebalance_frequency: str = 'monthly'
+    use_fractional: bool = True
+    capital: Optional[float] = None
+
+
+def _build(cls, data: dict, where: str):
+    """Instantiate a config dataclass, rejecting unknown or missing keys"""
+    unknown = set(data) - {f.name for f in fields(cls)}
+    if unknown:
+        raise ValueError(f"{where}: unknown config keys {sorted(unknown)}")
+    try:
+        return cls(**data)
+    except TypeError as e:
+        raise ValueError(f"{where}: {e}") from None
+
+
+def _parse_strategy(entry: dict) -> StrategyConfig:
+    """Map one YAML strategy entry onto StrategyConfig"""
+    entry = dict(entry)
+    where = f"strategy '{entry.get('name', '?')}'"
+    if 'class' in entry:
+        entry['class_name'] = entry.pop('class')
+    if 'account' in entry:
+        entry['account'] = _build(AccountConfig, entry['account'], f"{where} account")
+    return _build(StrategyConfig, entry, where)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(path: str, mtime: float) -> Tuple[StrategyConfig, ...]:
+    """Parse the YAML config - cached until the file changes on disk"""
+    with open(path, 'rb') as f:
+        raw = yaml.load(f, Loader=_YamlLoader)
+    return tuple(_parse_strategy(entry) for entry in raw['strategies'])
+
+
+def load_config(path: str = CONFIG_PATH) -> Tuple[StrategyConfig, ...]:
+    """Load strategy configuration from YAML"""
+    return _load_config_cached(path, os.path.getmtime(path))
+
+
+def missing_credentials(configs: Iterable[StrategyConfig]) -> List[str]:
+    """
+    Pre-flight check: env vars required by the given strategies that are unset or empty
+    The paper flag is optional (defaults to paper trading) so it is not required
+    """
+    required = set()
+    for config in configs:
+        required.add(config.account.api_key_env)
+        required.add(config.account.secret_key_env)
+    return sorted(name for name in required if not os.environ.get(name))
+
+
+@dataclass(frozen=True, slots=True)
+class Credentials:
+    """Alpaca credentials for one strategy account, resolved from the environment"""
+    name: str
+    api_key: str
+    secret_key: str
+    paper: bool
+
+
+@functools.lru_cache(maxsize=None)
+def load_credentials(name: str, api_key_env: str, secret_key_env: str,
+                     paper_env: str = 'PAPER_TRADING') -> Credentials:
+    """
+    Resolve an account's env vars once per process
+    Raises ValueError if the API key or secret is missing
+    """
+    api_key = os.getenv(api_key_env)
+    secret_key = os.getenv(secret_key_env)
+    if not api_key or not secret_key:
+        raise ValueError(f"Missing credentials for {name}")
+
+    paper = os.getenv(paper_env, 'true').lower() == 'true'
+    return Credentials(name, api_key, secret_key, paper)
@@ -1,12 +1,22 @@
 # shared/data_provider.py - UPDATED VERSION
 
 from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
+from alpaca.data.requests import StockBarsRequest, StockLatestBarRequest
 from alpaca.data.timeframe import TimeFrame
 from alpaca.data.enums import DataFeed  # ← Add this import
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
-import logging
+import json
+import os
+import threading
+import time
+
+from shared.loggers import get_logger
+
+MAX_BAR_SYMBOLS = 100  # symbols per StockBarsRequest
+DISK_CACHE_MAX_AGE = timedelta(days=7)  # full refetch after this, bounds how old cached bars can get
 
 
 class DataProvider:
@@ -15,38 +25,242 @@ class DataProvider:
     Shared across all strategies to minimize API calls
     """
 
-    def __init__(self, api_key: str, secret_key: str):
+    def __init__(self, api_key: str, secret_key: str, cache_ttl: float = 300.0, cache_size: int = 256,
+                 cache_dir: Optional[str] = None):
         self.client = StockHistoricalDataClient(api_key, secret_key)
-        self.logger = logging.getLogger("DataProvider")
+        self.logger = get_logger("DataProvider")
+
+        # Bars cache shared by every strategy: key -> (expires_at, DataFrame)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+        # Completed daily bars persisted across restarts - only newer bars are downloaded
+        self.cache_dir = cache_dir or os.path.join(os.getenv('STATE_DIR', './data'), 'bars_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._disk_lock = threading.Lock()
 
     def get_historical_bars(self, symbol: str, days: int, timeframe: TimeFrame = TimeFrame.Day) -> pd.DataFrame:
         """
         Fetch historical bars using IEX feed (free with Basic tier)
         Returns DataFrame with columns: open, high, low, close, volume
+        Identical requests within cache_ttl seconds (same day) are served from memory,
+        callers must treat the returned DataFrame as read-only
+        """
+        return self.get_historical_bars_multi([symbol], days, timeframe).get(symbol, pd.DataFrame())
+
+    def get_historical_bars_multi(self, symbols: List[str], days: int,
+                                  timeframe: TimeFrame = TimeFrame.Day) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch bars for many symbols with one request per MAX_BAR_SYMBOLS symbols
+        Returns: {symbol: DataFrame}, symbols without data are omitted
+        """
+        today = datetime.now().date()
+        result = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):  # dedupe, keep order
+            cached = self._cache_get((symbol, days, str(timeframe), today))
+            if cached is not None:
+                self.logger.debug("Cache hit for %s (%s days)", symbol, days)
+                result[symbol] = cached
+            else:
+                missing.append(symbol)
+
+        if missing:
+            if str(timeframe) == str(TimeFrame.Day):
+                fetched = self._fetch_daily_bars(missing, days)
+            else:
+                fetched = self._fetch_bars(missing, days, timeframe)
+            for symbol, df in fetched.items():
+                if not df.empty:
+                    self._cache_put((symbol, days, str(timeframe), today), df)
+                    result[symbol] = df
+
+        return result
+
+    def get_latest_bar(self, symbol: str) -> Optional[Tuple[float, int]]:
+        """
+        Most recent IEX bar as plain scalars (no DataFrame)
+        Returns: (close, int64 epoch-ns timestamp), or None if the request fails
         """
         try:
-            end = datetime.now()
-            start = end - timedelta(days=days + 10)  # Buffer for weekends
+            request = StockLatestBarRequest(symbol_or_symbols=symbol, feed=DataFeed.IEX)
+            bar = self.client.get_stock_latest_bar(request)[symbol]
+            return float(bar.close), pd.Timestamp(bar.timestamp).value
+        except Exception as e:
+            self.logger.error("Failed to fetch latest bar for %s: %s", symbol, e)
+            return None
 
-            request = StockBarsRequest(
-                symbol_or_symbols=symbol,
-                timeframe=timeframe,
-                start=start,
-                end=end,
-                feed=DataFeed.IEX  # ← KEY CHANGE: Use IEX instead of SIP
-            )
+    def get_bar_arrays(self, symbol: str, days: int, timeframe: TimeFrame = TimeFrame.Day) -> Dict[str, np.ndarray]:
+        """
+        Historical bars as contiguous NumPy columns (struct-of-arrays)
+        Returns: {'close': float64 array, 'ts': int64 epoch-ns array}, oldest first
+        """
+        df = self.get_historical_bars(symbol, days, timeframe)
+        if df.empty:
+            return {'close': np.empty(0, dtype=np.float64), 'ts': np.empty(0, dtype=np.int64)}
 
-            bars = self.client.get_stock_bars(request)
-            df = bars.df
+        return {
+            'close': df['close'].to_numpy(dtype=np.float64),
+            'ts': pd.DatetimeIndex(df.index).asi8,
+        }
 
-            # Handle multi-index if present
-            if isinstance(df.index, pd.MultiIndex):
-                if symbol in df.index.get_level_values(0):
-                    df = df.xs(symbol, level=0)
+    def clear_cache(self):
+        """Drop all cached bars (e.g. after the market close)"""
+        with self._cache_lock:
+            self._cache.clear()
 
-            self.logger.info(f"Fetched {len(df)} bars for {symbol} (IEX feed)")
+    def _cache_get(self, key):
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, df = entry
+            if time.monotonic() >= expires_at:
+                del self._cache[key]
+                return None
             return df
 
+    def _cache_put(self, key, df: pd.DataFrame):
+        with self._cache_lock:
+            now = time.monotonic()
+            if len(self._cache) >= self.cache_size:
+                # Evict expired entries first, then the oldest insertion
+                for k in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                    del self._cache[k]
+                if len(self._cache) >= self.cache_size:
+                    del self._cache[next(iter(self._cache))]
+            self._cache[key] = (now + self.cache_ttl, df)
+
+    def _fetch_daily_bars(self, symbols: List[str], days: int) -> Dict[str, pd.DataFrame]:
+        """
+        Daily bars backed by the on-disk cache
+        Completed bars are immutable, so only bars after the last cached one are requested
+        Coverage is judged by the start date last requested, not the first bar - the
+        first bar can be days later when the window opened on a weekend or holiday
+        """
+        now = datetime.now()
+        start = now - timedelta(days=days + 10)  # Buffer for weekends
+
+        with self._disk_lock:
+            histories = {symbol: self._load_disk_bars(symbol) for symbol in symbols}
+
+            # Split into symbols needing a full download and incremental groups keyed by start
+            full_refresh = []
+            incremental = {}
+            for symbol, (history, last_fetch, coverage_start) in histories.items():
+                stale = last_fetch is None or now - last_fetch > DISK_CACHE_MAX_AGE
+                if history.empty or stale or coverage_start is None or coverage_start > start.date():
+                    full_refresh.append(symbol)
+                else:
+                    next_day = history.index[-1].date() + timedelta(days=1)
+                    incremental.setdefault(datetime.combine(next_day, datetime.min.time()), []).append(symbol)
+
+            fetched = {}
+            full_start = start
+            if full_refresh:
+                # Keep covering the longest window any caller has asked for
+                full_days = max([days] + [
+                    (now.date() - histories[symbol][2]).days - 10
+                    for symbol in full_refresh if histories[symbol][2] is not None
+                ])
+                full_start = now - timedelta(days=full_days + 10)
+                fetched.update(self._fetch_bars(full_refresh, full_days, TimeFrame.Day, start=full_start))
+            for since, group in incremental.items():
+                fetched.update(self._fetch_bars(group, days, TimeFrame.Day, start=since))
+
+            result = {}
+            for symbol, (history, last_fetch, coverage_start) in histories.items():
+                fresh = fetched.get(symbol)
+                if symbol in full_refresh:
+                    if fresh is None or fresh.empty:
+                        continue
+                    df = fresh
+                    last_fetch = now
+                    coverage_start = full_start.date()
+                else:
+                    df = pd.concat([history, fresh]) if fresh is not None and not fresh.empty else history
+
+                # Today's bar is still forming - never persist it
+                cutoff = pd.Timestamp(now.date(), tz=df.index.tz)
+                self._save_disk_bars(symbol, df[df.index < cutoff], last_fetch, coverage_start)
+                result[symbol] = df[df.index >= pd.Timestamp(start.date(), tz=df.index.tz)]
+
+        return result
+
+    def _disk_cache_paths(self, symbol: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, f"{symbol}_{TimeFrame.Day}")
+        return base + '.pkl', base + '.meta.json'
+
+    def _load_disk_bars(self, symbol: str) -> Tuple[pd.DataFrame, Optional[datetime], Optional[date]]:
+        """
+        Return (cached bars, last full fetch time, start date the full fetch requested)
+        Empty frame and Nones if nothing usable
+        """
+        bars_path, meta_path = self._disk_cache_paths(symbol)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            coverage_start = meta.get('coverage_start')  # absent in older caches - forces one full fetch
+            return (pd.read_pickle(bars_path), datetime.fromisoformat(meta['last_fetch']),
+                    date.fromisoformat(coverage_start) if coverage_start else None)
+        except FileNotFoundError:
+            return pd.DataFrame(), None, None
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable bars cache for %s: %s", symbol, e)
+            return pd.DataFrame(), None, None
+
+    def _save_disk_bars(self, symbol: str, df: pd.DataFrame, last_fetch: datetime, coverage_start: date):
+        """Atomically write bars plus meta sidecar"""
+        if df.empty:
+            return
+
+        bars_path, meta_path = self._disk_cache_paths(symbol)
+        meta = {
+            'last_fetch': last_fetch.isoformat(),
+            'coverage_start': coverage_start.isoformat(),
+            'last_bar_date': df.index[-1].date().isoformat(),
+        }
+        try:
+            df.to_pickle(bars_path + '.tmp')
+            os.replace(bars_path + '.tmp', bars_path)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.tmp', meta_path)
         except Exception as e:
-            self.logger.error(f"Failed to fetch bars for {symbol}: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            self.logger.warning("Failed to write bars cache for %s: %s", symbol, e)
+
+    def _fetch_bars(self, symbols: List[str], days: int, timeframe: TimeFrame,
+                    start: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch bars from Alpaca (uncached), from `start` if given else the last `days` days"""
+        end = datetime.now()
+        if start is None:
+            start = end - timedelta(days=days + 10)  # Buffer for weekends
+
+        result = {}
+        for i in range(0, len(symbols), MAX_BAR_SYMBOLS):
+            chunk = symbols[i:i + MAX_BAR_SYMBOLS]
+            try:
+                request = StockBarsRequest(
+                    symbol_or_symbols=chunk,
+                    timeframe=timeframe,
+                    start=start,
+                    end=end,
+                    feed=DataFeed.IEX  # ← KEY CHANGE: Use IEX instead of SIP
+                )
+
+                df = self.client.get_stock_bars(request).df
+
+                # Multi-index (symbol, timestamp) - split per symbol
+                if isinstance(df.index, pd.MultiIndex):
+                    returned = set(df.index.get_level_values(0))
+                    for symbol in chunk:
+                        if symbol in returned:
+                            result[symbol] = df.xs(symbol, level=0)
+                            self.logger.info("Fetched %d bars for %s (IEX feed)", len(result[symbol]), symbol)
+
+            except Exception as e:
+                self.logger.error("Failed to fetch bars for %s: %s", ', '.join(chunk), e)
+
+        return result
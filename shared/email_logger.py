@@ -1,16 +1,24 @@
 # shared/email_logger.py
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 from datetime import datetime
+import gzip
 import logging
+from logging.handlers import RotatingFileHandler
 import os
-from typing import List
+from typing import List, Tuple
+
+from shared.loggers import get_logger
+
+SUMMARY_TAIL_LINES = 50  # most recent lines shown in the email body
+ATTACHMENT_LINES = 1000  # lines attached to the summary
+TAIL_READ_BYTES = 1024 * 1024  # enough to hold ATTACHMENT_LINES
 
 
 class EmailLogger:
     """
     Send daily log summaries via email
+    Summary lines are written straight to a rotating file, nothing accumulates in memory
     """
 
     def __init__(self):
@@ -20,13 +28,21 @@ class EmailLogger:
         self.sender_password = os.getenv('SENDER_PASSWORD')
         self.recipient_email = os.getenv('RECIPIENT_EMAIL')
 
-        self.logger = logging.getLogger("EmailLogger")
-        self.log_buffer = []
+        self.logger = get_logger("EmailLogger")
+        self._smtp = None  # authenticated connection kept open between sends
+
+        # Dedicated summary log - survives restarts, rolled over after each successful send
+        state_dir = os.getenv('STATE_DIR', './data')
+        os.makedirs(state_dir, exist_ok=True)
+        self.summary_file = os.path.join(state_dir, 'trade.log')
+        self._handler = RotatingFileHandler(self.summary_file, maxBytes=5 * 1024 * 1024, backupCount=3)
+        self._handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', '%Y-%m-%d %H:%M:%S'))
+        self._summary_log = logging.Logger("EmailSummary")  # standalone - not routed through root
+        self._summary_log.addHandler(self._handler)
 
     def add_log(self, message: str):
-        """Add log message to buffer"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.log_buffer.append(f"[{timestamp}] {message}")
+        """Append message to the summary file (thread-safe via the handler lock)"""
+        self._summary_log.info(message)
 
     def send_daily_summary(self, subject: str = None):
         """Send daily log summary via email"""
@@ -34,13 +50,14 @@ class EmailLogger:
             self.logger.warning("Email credentials not configured, skipping email")
             return
 
-        if not self.log_buffer:
+        lines, read_end = self._read_tail()
+        if not lines:
             self.logger.info("No logs to send")
             return
 
         try:
             # Create message
-            msg = MIMEMultipart()
+            msg = EmailMessage()
             msg['From'] = self.sender_email
             msg['To'] = self.recipient_email
 
@@ -48,20 +65,83 @@ class EmailLogger:
                 subject = f"Trading System Daily Report - {datetime.now().strftime('%Y-%m-%d')}"
             msg['Subject'] = subject
 
-            # Create body
-            body = "\n".join(self.log_buffer)
-            msg.attach(MIMEText(body, 'plain'))
+            # Create body - recent lines inline, the last ATTACHMENT_LINES attached gzipped
+            msg.set_content("\n".join(lines[-SUMMARY_TAIL_LINES:]))
+            attachment = gzip.compress(("\n".join(lines) + "\n").encode())
+            msg.add_attachment(attachment, maintype='application', subtype='gzip', filename='log.gz')
 
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+            # Send email - retry once on a fresh connection if the cached one was dropped
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                self._get_smtp().send_message(msg)
 
             self.logger.info(f"Daily summary sent to {self.recipient_email}")
+            self._roll_over(read_end)
 
-            # Clear buffer
-            self.log_buffer = []
+        except Exception as e:
+            self.close()
+            self.logger.error(f"Failed to send email: {e}")
+
+    def _read_tail(self) -> Tuple[List[str], int]:
+        """Return (last ATTACHMENT_LINES lines of the summary file, file offset read up to)"""
+        self._handler.acquire()
+        try:
+            self._handler.flush()
+            try:
+                with open(self.summary_file, 'rb') as f:
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(max(0, size - TAIL_READ_BYTES))
+                    data = f.read(size - f.tell())
+            except FileNotFoundError:
+                return [], 0
+        finally:
+            self._handler.release()
 
+        lines = data.decode(errors='replace').splitlines()
+        if size > TAIL_READ_BYTES:
+            lines = lines[1:]  # first line may be cut mid-way
+        return lines[-ATTACHMENT_LINES:], size
+
+    def _roll_over(self, sent_up_to: int):
+        """Start a fresh summary file, carrying over lines added while the email was sending"""
+        self._handler.acquire()
+        try:
+            self._handler.flush()
+            with open(self.summary_file, 'rb') as f:
+                f.seek(sent_up_to)
+                unsent = f.read()
+            self._handler.doRollover()
+            if unsent:
+                self._handler.stream.write(unsent.decode(errors='replace'))
+                self._handler.flush()
         except Exception as e:
-            self.logger.error(f"Failed to send email: {e}")
\ No newline at end of file
+            self.logger.warning(f"Failed to roll over {self.summary_file}: {e}")
+        finally:
+            self._handler.release()
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the open SMTP connection, reconnecting if the server dropped it"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        self._smtp = server
+        return server
+
+    def close(self):
+        """Close the cached SMTP connection"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
\ No newline at end of file
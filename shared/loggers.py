@@ -0,0 +1,17 @@
+# shared/loggers.py
+import logging
+from typing import Dict
+
+# name -> Logger, read without taking the logging module lock
+_LOGGERS: Dict[str, logging.Logger] = {}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Cached logging.getLogger for per-instance loggers
+    Records still propagate to the root QueueHandler set up in main.py
+    """
+    logger = _LOGGERS.get(name)
+    if logger is None:
+        logger = _LOGGERS.setdefault(name, logging.getLogger(name))
+    return logger
@@ -1,7 +1,14 @@
 # shared/market_calendar.py
-from datetime import datetime, time
+from alpaca.trading.requests import GetCalendarRequest
+from datetime import date, datetime, time, timedelta
 import pytz
-from typing import Optional
+import threading
+import time as _time
+from typing import Optional, Tuple
+
+from shared.loggers import get_logger
+
+TRADING_DAYS_HORIZON = timedelta(days=365)
 
 
 class MarketCalendar:
@@ -11,6 +18,7 @@ class MarketCalendar:
     """
 
     def __init__(self):
+        self.logger = get_logger("MarketCalendar")
         self.market_tz = pytz.timezone('America/New_York')
         self.utc_tz = pytz.UTC
 
@@ -22,6 +30,81 @@ class MarketCalendar:
         self.pre_market_open = time(4, 0)
         self.after_market_close = time(20, 0)
 
+        # Seconds since midnight ET for the hot-path checks
+        self.open_sec = self.market_open.hour * 3600 + self.market_open.minute * 60
+        self.close_sec = self.market_close.hour * 3600 + self.market_close.minute * 60
+
+        # (utc_hour_bucket, et_offset_seconds) - DST switches happen on the hour
+        self._offset_cache = (None, 0)
+
+        # Exchange sessions from Alpaca's calendar - weekdays only until a client is attached
+        self._trading_client = None
+        self._trading_days = frozenset()
+        self._trading_days_range = None  # (first, last) date covered
+        self._trading_days_lock = threading.Lock()
+        self._calendar_retry_at = 0.0  # monotonic time before which a failed load is not retried
+
+    def load_trading_days(self, trading_client):
+        """Attach an Alpaca TradingClient and load a year of sessions (holidays excluded)"""
+        self._trading_client = trading_client
+        self._refresh_trading_days(self.get_market_time().date())
+
+    def _refresh_trading_days(self, from_date: date):
+        with self._trading_days_lock:
+            if _time.monotonic() < self._calendar_retry_at:
+                return
+            covered = self._trading_days_range
+            start = from_date - timedelta(days=7)
+            end = from_date + TRADING_DAYS_HORIZON
+            if covered is not None:
+                if covered[0] <= from_date <= covered[1]:
+                    return  # loaded by another thread meanwhile
+                # Extend from the loaded edge so the merged range has no unfetched gap
+                if from_date > covered[1]:
+                    start = covered[1] + timedelta(days=1)
+                else:
+                    end = covered[0] - timedelta(days=1)
+            try:
+                sessions = self._trading_client.get_calendar(GetCalendarRequest(start=start, end=end))
+            except Exception as e:
+                self.logger.warning("Failed to load market calendar, treating weekdays as trading days: %s", e)
+                self._calendar_retry_at = _time.monotonic() + 3600
+                return
+            # Merge - a lookup far from today must not evict the sessions around today
+            self._trading_days = self._trading_days | frozenset(session.date for session in sessions)
+            if covered is not None:
+                start, end = min(start, covered[0]), max(end, covered[1])
+            self._trading_days_range = (start, end)
+            self.logger.info("Loaded %d trading days from %s through %s", len(self._trading_days), start, end)
+
+    def is_trading_day(self, day: date) -> bool:
+        """True if the exchange is open on `day` (weekdays only if no calendar is loaded)"""
+        if self._trading_client is not None:
+            covered = self._trading_days_range
+            if covered is None or not covered[0] <= day <= covered[1]:
+                self._refresh_trading_days(day)  # lazy re-population past the horizon
+                covered = self._trading_days_range
+            if covered is not None and covered[0] <= day <= covered[1]:
+                return day in self._trading_days
+
+        return day.weekday() < 5
+
+    def _market_clock(self) -> Tuple[int, float]:
+        """Current (days since epoch, seconds since midnight) in ET without building datetimes"""
+        now = _time.time()
+        bucket = int(now // 3600)
+        cached_bucket, offset = self._offset_cache
+        if cached_bucket != bucket:
+            offset = datetime.fromtimestamp(bucket * 3600, self.market_tz).utcoffset().total_seconds()
+            self._offset_cache = (bucket, offset)
+
+        local = now + offset
+        return int(local // 86400), local % 86400
+
+    @staticmethod
+    def _epoch_day_to_date(epoch_day: int) -> date:
+        return date.fromordinal(epoch_day + 719163)  # ordinal of 1970-01-01
+
     def get_market_time(self) -> datetime:
         """Get current time in market timezone (ET)"""
         return datetime.now(self.market_tz)
@@ -29,10 +112,12 @@ class MarketCalendar:
     def is_market_open(self, check_time: Optional[datetime] = None) -> bool:
         """
         Check if market is currently open
-        Does NOT check if today is a trading day (weekends/holidays)
+        Skips weekends, and holidays once load_trading_days() has been called
         """
         if check_time is None:
-            check_time = self.get_market_time()
+            epoch_day, seconds = self._market_clock()
+            return self.open_sec <= seconds <= self.close_sec and \
+                self.is_trading_day(self._epoch_day_to_date(epoch_day))
         elif check_time.tzinfo is None:
             check_time = self.market_tz.localize(check_time)
         else:
@@ -40,8 +125,8 @@ class MarketCalendar:
 
         current_time = check_time.time()
 
-        # Check if it's a weekday
-        if check_time.weekday() >= 5:  # Saturday=5, Sunday=6
+        # Check if it's a trading day
+        if not self.is_trading_day(check_time.date()):
             return False
 
         return self.market_open <= current_time <= self.market_close
@@ -51,27 +136,14 @@ class MarketCalendar:
         Check if it's time to rebalance (default: 3:30 PM ET)
         Called every minute to check
         """
-        now = self.get_market_time()
-
-        # Check if weekday
-        if now.weekday() >= 5:
-            return False
-
-        current_time = now.time()
-
-        # Check if we're within 1 minute of target time
-        target_hour = target_time.hour
-        target_minute = target_time.minute
+        epoch_day, seconds = self._market_clock()
 
-        is_target_time = (
-                current_time.hour == target_hour and
-                current_time.minute == target_minute
-        )
-
-        return is_target_time
+        # Check if we're within 1 minute of target time on a trading day
+        return int(seconds // 60) == target_time.hour * 60 + target_time.minute and \
+            self.is_trading_day(self._epoch_day_to_date(epoch_day))
 
     def get_next_market_day(self, from_date: Optional[datetime] = None) -> datetime:
-        """Get next market day (skips weekends, NOT holidays)"""
+        """Get next market day (skips weekends, and holidays once a calendar is loaded)"""
         if from_date is None:
             from_date = self.get_market_time()
 
@@ -80,9 +152,36 @@ class MarketCalendar:
             next_day = next_day.replace(hour=9, minute=30, second=0, microsecond=0)
             next_day = next_day + timedelta(days=1)
 
-            if next_day.weekday() < 5:  # Weekday
+            if self.is_trading_day(next_day.date()):
                 return next_day
 
+    def next_epoch_at(self, target_time: time, trading_days_only: bool = True,
+                      after: Optional[datetime] = None) -> float:
+        """
+        Unix timestamp of the next target_time (ET) strictly after `after` (default: now)
+        Skips non-trading days when trading_days_only is set (see is_trading_day)
+        """
+        if after is None:
+            after = self.get_market_time()
+        elif after.tzinfo is None:
+            after = self.market_tz.localize(after)
+
+        candidate_date = after.astimezone(self.market_tz).date()
+        while True:
+            # localize per date so DST transitions are handled
+            candidate = self.market_tz.localize(datetime.combine(candidate_date, target_time))
+            if candidate > after and (not trading_days_only or self.is_trading_day(candidate_date)):
+                return candidate.timestamp()
+            candidate_date += timedelta(days=1)
+
+    def next_rebalance_epoch(self, target_time: time = time(15, 30)) -> float:
+        """Unix timestamp of the next rebalance check (default: 3:30 PM ET on trading days)"""
+        return self.next_epoch_at(target_time)
+
+    def next_email_epoch(self, target_time: time = time(17, 0)) -> float:
+        """Unix timestamp of the next daily email (default: 5 PM ET, every day)"""
+        return self.next_epoch_at(target_time, trading_days_only=False)
+
     def time_until_next_check(self) -> int:
         """
         Return seconds until next check time
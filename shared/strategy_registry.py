@@ -0,0 +1,29 @@
+# shared/strategy_registry.py
+from importlib import import_module
+
+from shared.config import StrategyConfig
+from strategies.volatility_regime import VolatilityRegimeStrategy
+
+# "module:ClassName" -> strategy class, resolved at import time
+REGISTRY = {
+    'strategies.volatility_regime:VolatilityRegimeStrategy': VolatilityRegimeStrategy,
+}
+
+
+def get_strategy_class(module: str, class_name: str):
+    """
+    Look up a strategy class in the registry
+    Unregistered strategies are imported dynamically once and then cached
+    """
+    key = f"{module}:{class_name}"
+    strategy_class = REGISTRY.get(key)
+    if strategy_class is None:
+        strategy_class = getattr(import_module(module), class_name)
+        REGISTRY[key] = strategy_class
+    return strategy_class
+
+
+def create_strategy(strategy_config: StrategyConfig, broker, data_provider):
+    """Create strategy instance from config"""
+    strategy_class = get_strategy_class(strategy_config.module, strategy_config.class_name)
+    return strategy_class(broker, data_provider, rebalance_frequency=strategy_config.rebalance_frequency)
@@ -0,0 +1,36 @@
+# strategies/_fast_vol.py
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit  # optional JIT, pays off for long lookback windows
+except ImportError:
+    njit = None
+
+
+def _return_moments_numpy(prices: np.ndarray) -> Tuple[float, float, int]:
+    prev, curr = prices[:-1], prices[1:]
+    valid = curr != 0
+    returns = ((prev[valid] - curr[valid]) / curr[valid]).tolist()
+    return math.fsum(returns), math.fsum(r * r for r in returns), len(returns)
+
+
+def _return_moments_loop(prices):
+    total = 0.0
+    total_sq = 0.0
+    count = 0
+    for i in range(prices.shape[0] - 1):
+        curr = prices[i + 1]
+        if curr != 0:
+            r = (prices[i] - curr) / curr
+            total += r
+            total_sq += r * r
+            count += 1
+    return total, total_sq, count
+
+
+# return_moments(prices) -> (sum, sum of squares, count) of the window's daily returns
+# (p[i-1] - p[i]) / p[i], skipping zero prices; prices oldest first, float64
+return_moments = njit(cache=True, fastmath=True)(_return_moments_loop) if njit else _return_moments_numpy
@@ -1,24 +1,36 @@
 # strategies/base_strategy.py
 from abc import ABC, abstractmethod
 from datetime import datetime
-import logging
 import json
+import numpy as np
 import os
 from typing import Dict, Optional
 import time
 
+from shared.alpaca_broker import REBALANCE_TOLERANCE
+from shared.loggers import get_logger
+
+try:
+    import orjson  # optional C-accelerated JSON
+except ImportError:
+    orjson = None
+
 
 class BaseStrategy(ABC):
     """
     Abstract base class for all trading strategies
     Handles state persistence and execution logic
+    Declares __slots__ - subclasses without their own __slots__ still get a __dict__
     """
 
+    __slots__ = ('name', 'broker', 'data_provider', 'logger', 'is_initialized',
+                 'state_dir', 'state_file')
+
     def __init__(self, name: str, broker, data_provider):
         self.name = name
         self.broker = broker
         self.data_provider = data_provider
-        self.logger = logging.getLogger(name)
+        self.logger = get_logger(name)
         self.is_initialized = False
 
         # State directory - works locally and on Render
@@ -53,8 +65,9 @@ class BaseStrategy(ABC):
         """Load persisted state from file"""
         if os.path.exists(self.state_file):
             try:
-                with open(self.state_file, 'r') as f:
-                    state = json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    raw = f.read()
+                state = orjson.loads(raw) if orjson else json.loads(raw)
                 self.logger.info(f"State restored from {self.state_file}")
                 return state
             except Exception as e:
@@ -63,10 +76,19 @@ class BaseStrategy(ABC):
         return None
 
     def save_state(self, state_data: dict):
-        """Persist state to file"""
+        """Persist state to file (atomic: write temp file, then rename over the old one)"""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(state_data, f, indent=2, default=str)
+            if orjson:
+                data = orjson.dumps(
+                    state_data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str
+                )
+            else:
+                data = json.dumps(state_data, default=str).encode()
+
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.state_file)
             self.logger.info(f"State saved to {self.state_file}")
         except Exception as e:
             self.logger.error(f"Failed to save state: {e}")
@@ -111,35 +133,31 @@ class BaseStrategy(ABC):
         # Get current portfolio weights
         current_weights = self.broker.get_portfolio_weights()
 
-        # Normalize target allocation (ensure sums to ~1.0)
-        target_total = sum(target_allocation.values())
+        # Normalize target allocation (ensure sums to ~1.0) as one array pass
+        symbols = list(target_allocation)
+        target_weights = np.array(list(target_allocation.values()), dtype=np.float64)
+        target_total = target_weights.sum()
         if target_total > 0:
-            target_allocation = {s: w / target_total for s, w in target_allocation.items()}
+            target_weights /= target_total
+        target_allocation = dict(zip(symbols, target_weights.tolist()))
 
         self.logger.info(f"Current allocation: {current_weights}")
         self.logger.info(f"Target allocation: {target_allocation}")
 
         # Find positions to liquidate (in current but not in target, or weight = 0)
-        to_liquidate = []
-        for symbol in current_weights.keys():
-            target_weight = target_allocation.get(symbol, 0.0)
-            if target_weight == 0:
-                to_liquidate.append(symbol)
-
-        # Find positions to buy/adjust (in target allocation)
-        to_adjust = {}
-        for symbol, target_weight in target_allocation.items():
-            if target_weight > 0:
-                current_weight = current_weights.get(symbol, 0.0)
-                # Only adjust if weight differs by more than 0.1%
-                if abs(current_weight - target_weight) > 0.001:
-                    to_adjust[symbol] = target_weight
+        to_liquidate = [s for s in current_weights if target_allocation.get(s, 0.0) == 0]
+
+        # Find positions to buy/adjust - only if weight differs by more than the tolerance (0.1%)
+        held_weights = np.array([current_weights.get(s, 0.0) for s in symbols], dtype=np.float64)
+        needs_trade = (target_weights > 0) & (np.abs(target_weights - held_weights) > REBALANCE_TOLERANCE)
+        adjust_idx = np.flatnonzero(needs_trade)
+        to_adjust = dict(zip([symbols[i] for i in adjust_idx], target_weights[adjust_idx].tolist()))
 
         # Execute liquidations first
         if to_liquidate:
             self.logger.info(f"Liquidating: {to_liquidate}")
-            for symbol in to_liquidate:
-                self.broker.liquidate_position(symbol)
+            # Closes run concurrently and return once every position is gone (wash trade guard)
+            self.broker.liquidate_all_symbols(to_liquidate)
 
             # Wait a bit after liquidations
             time.sleep(1)
@@ -147,8 +165,7 @@ class BaseStrategy(ABC):
         # Execute new positions/adjustments
         if to_adjust:
             self.logger.info(f"Adjusting positions: {to_adjust}")
-            for symbol, target_weight in to_adjust.items():
-                self.broker.set_holdings(symbol, target_weight)
+            self.broker.set_holdings_batch(to_adjust, current_weights=current_weights)
         elif not to_liquidate:
             self.logger.info("No rebalancing needed - portfolio matches target allocation")
 
@@ -1,9 +1,32 @@
 # strategies/volatility_regime.py
 from strategies.base_strategy import BaseStrategy
-from collections import deque
-from datetime import datetime, timedelta
+from strategies._fast_vol import return_moments
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
 import numpy as np
+import pytz
 import calendar
+import math
+import time as _time
+
+_MARKET_TZ = pytz.timezone('America/New_York')
+_MARKET_OPEN = time(9, 30)
+_MARKET_CLOSE = time(16, 0)
+PRICE_REFRESH_SECONDS = 60  # min gap between refetches of a still-forming bar
+
+
+@lru_cache(maxsize=4096)
+def _is_month_end(ordinal: int) -> bool:
+    """Last 3 days of the month - keyed by date ordinal, shared by every strategy instance"""
+    day = date.fromordinal(ordinal)
+    return day.day >= calendar.monthrange(day.year, day.month)[1] - 2
+
+
+def _market_date(ts_ns: int) -> date:
+    """Trading date (US/Eastern) of an epoch-ns bar timestamp"""
+    return datetime.fromtimestamp(ts_ns / 1e9, _MARKET_TZ).date()
 
 
 class VolatilityRegimeStrategy(BaseStrategy):
@@ -17,6 +40,23 @@ class VolatilityRegimeStrategy(BaseStrategy):
     - 'adaptive': Rebalance on regime change OR weekly safety check
     """
 
+    __slots__ = (
+        'rebalance_frequency',
+        # Parameters
+        'vol_lookback', 'vol_low_threshold', 'vol_high_threshold', 'vix_panic_threshold',
+        'max_recovery_days', 'vix_recovery_threshold',
+        # Regime lookup tables
+        '_recovery_limit', '_normal_thresholds', '_normal_regimes', '_no_data_regime',
+        '_recovery_thresholds', '_recovery_regimes',
+        # Price window and rolling return moments
+        '_prices_buf', '_prices_head', '_prices_count', '_prices_version', '_vol_cache',
+        '_last_price_date', '_last_price_final', '_next_price_fetch', '_ret_sum', '_ret_sq_sum', '_ret_count', '_appends_since_resync',
+        'current_vix', 'current_volatility',
+        # State tracking
+        'in_recovery_mode', '_recovery_mode_start', '_recovery_mode_start_iso',
+        '_last_rebalance_date', '_last_rebalance_date_iso', 'last_regime', 'trade_count',
+    )
+
     def __init__(self, broker, data_provider, rebalance_frequency='monthly'):
         super().__init__(f"VolRegime-{rebalance_frequency}", broker, data_provider)
 
@@ -39,8 +79,39 @@ class VolatilityRegimeStrategy(BaseStrategy):
         self.max_recovery_days = 45
         self.vix_recovery_threshold = 20
 
+        # Regime lookup tables: bisect_right(thresholds, vol) indexes the regime list
+        # nextafter makes vol == vol_high_threshold still count as MEDIUM (vol must be > high for SH)
+        self._recovery_limit = self.vol_low_threshold * 1.5
+        self._normal_thresholds = [self.vol_low_threshold, math.nextafter(self.vol_high_threshold, math.inf)]
+        self._normal_regimes = [
+            ("LOW_VOL_LEVERAGE", {'UPRO': 1.0}),
+            ("MEDIUM_VOL_NEUTRAL", {'SPY': 1.0}),
+            ("HIGH_VOL_DEFENSIVE", {'SH': 1.0}),
+        ]
+        self._no_data_regime = ("NO_DATA_NEUTRAL", {'SPY': 1.0})
+        self._recovery_thresholds = [self._recovery_limit]
+        self._recovery_regimes = [
+            ("RECOVERY_LEVERAGE", {'UPRO': 1.0}),
+            ("RECOVERY_NEUTRAL", {'SPY': 1.0}),
+        ]
+
         # Data storage
-        self.spy_prices = deque(maxlen=self.vol_lookback + 1)
+        # SPY closes in a fixed-size ring buffer: head is the next write slot (oldest once full)
+        self._prices_buf = np.zeros(self.vol_lookback + 1, dtype=np.float64)
+        self._prices_head = 0
+        self._prices_count = 0
+        self._prices_version = 0  # bumped on every new price
+        self._vol_cache = (None, -1)  # (volatility, prices version it was computed from)
+        self._last_price_date = None  # trading date of the newest price in the window
+        self._last_price_final = False  # False while that price comes from a still-forming bar
+        self._next_price_fetch = 0.0  # monotonic time before which a partial bar is not refetched
+
+        # Rolling return moments - O(1) update per new price
+        self._ret_sum = 0.0
+        self._ret_sq_sum = 0.0
+        self._ret_count = 0
+        self._appends_since_resync = 0
+
         self.current_vix = None
         self.current_volatility = None
 
@@ -51,6 +122,25 @@ class VolatilityRegimeStrategy(BaseStrategy):
 
         self.logger.info(f"Strategy configured with '{rebalance_frequency}' rebalancing")
 
+    @property
+    def last_rebalance_date(self) -> Optional[datetime]:
+        return self._last_rebalance_date
+
+    @last_rebalance_date.setter
+    def last_rebalance_date(self, value: Optional[datetime]):
+        # Serialized once per change, reused by every save_state
+        self._last_rebalance_date = value
+        self._last_rebalance_date_iso = value.isoformat() if value else None
+
+    @property
+    def recovery_mode_start(self) -> Optional[datetime]:
+        return self._recovery_mode_start
+
+    @recovery_mode_start.setter
+    def recovery_mode_start(self, value: Optional[datetime]):
+        self._recovery_mode_start = value
+        self._recovery_mode_start_iso = value.isoformat() if value else None
+
     def initialize(self):
         """
         Initialize strategy - fetch historical data
@@ -73,14 +163,15 @@ class VolatilityRegimeStrategy(BaseStrategy):
                 f"State restored - Last rebalance: {self.last_rebalance_date}, Last regime: {self.last_regime}")
 
         # Fetch historical SPY data
-        spy_df = self.data_provider.get_historical_bars('SPY', self.vol_lookback + 5)
+        spy_bars = self.data_provider.get_bar_arrays('SPY', self.vol_lookback + 5)
+        spy_closes = spy_bars['close']
 
-        if spy_df.empty:
+        if spy_closes.size == 0:
             raise Exception("Failed to fetch SPY historical data")
 
-        # Populate price history
-        for price in spy_df['close'].tail(self.vol_lookback + 1):
-            self.spy_prices.append(float(price))
+        # Populate price history - dated by its last bar, so a partial bar gets refreshed later
+        self._load_prices(spy_closes)
+        self._set_last_price_date(_market_date(int(spy_bars['ts'][-1])), datetime.now(_MARKET_TZ))
 
         # Calculate current volatility
         self.current_volatility = self.calculate_volatility()
@@ -101,61 +192,57 @@ class VolatilityRegimeStrategy(BaseStrategy):
         """
         Check if rebalancing needed based on configured frequency
         """
+        today = datetime.now()  # one clock read per check, passed down
+
         if self.rebalance_frequency == 'daily':
-            return self._check_daily_rebalance()
+            return self._check_daily_rebalance(today)
         elif self.rebalance_frequency == 'weekly':
-            return self._check_weekly_rebalance()
+            return self._check_weekly_rebalance(today)
         elif self.rebalance_frequency == 'monthly':
-            return self._check_monthly_rebalance()
+            return self._check_monthly_rebalance(today)
         elif self.rebalance_frequency == 'adaptive':
-            return self._check_adaptive_rebalance()
+            return self._check_adaptive_rebalance(today)
 
         return False
 
-    def _check_daily_rebalance(self) -> bool:
+    def _check_daily_rebalance(self, today: datetime) -> bool:
         """
         Daily: Rebalance when regime changes (max once per day)
         """
-        today = datetime.now()
+        # Cheap calendar gates first - market data is only fetched if a rebalance is possible
+        if today.weekday() >= 5:
+            return False
 
         # Don't rebalance twice same day
         if self.last_rebalance_date and self.last_rebalance_date.date() == today.date():
             self.logger.debug("Already rebalanced today")
             return False
 
-        # Get current regime
-        current_regime = self.get_current_regime()
+        # First run
+        if self.last_regime is None:
+            return True
 
         # Check if regime changed
-        if self.last_regime and current_regime != self.last_regime:
+        self.update_market_data()
+        current_regime = self.get_current_regime()
+        if current_regime != self.last_regime:
             self.logger.info(f"Regime changed: {self.last_regime} → {current_regime}")
             return True
 
-        # First run
-        if self.last_regime is None:
-            return True
-
         return False
 
-    def _check_weekly_rebalance(self) -> bool:
+    def _check_weekly_rebalance(self, today: datetime) -> bool:
         """
         Weekly: Rebalance every Friday
         """
-        today = datetime.now()
-
         # Check if Friday
         if today.weekday() != 4:  # Friday = 4
             return False
 
         # Check if already rebalanced this week
         if self.last_rebalance_date:
-            # Get ISO week number
-            current_week = today.isocalendar()[1]
-            current_year = today.year
-            last_week = self.last_rebalance_date.isocalendar()[1]
-            last_year = self.last_rebalance_date.year
-
-            same_week = (current_week == last_week and current_year == last_year)
+            # Monday-based week index - ordinal 1 (0001-01-01) is a Monday, so this matches ISO weeks
+            same_week = (today.toordinal() - 1) // 7 == (self.last_rebalance_date.toordinal() - 1) // 7
 
             if same_week:
                 self.logger.info("Already rebalanced this week")
@@ -164,17 +251,12 @@ class VolatilityRegimeStrategy(BaseStrategy):
         self.logger.info("Weekly rebalance check: Friday")
         return True
 
-    def _check_monthly_rebalance(self) -> bool:
+    def _check_monthly_rebalance(self, today: datetime) -> bool:
         """
         Monthly: Rebalance at month-end (last 3 days of month)
         """
-        today = datetime.now()
-
         # Check if month-end (last 3 days accounting for weekends)
-        last_day = calendar.monthrange(today.year, today.month)[1]
-        is_month_end = today.day >= last_day - 2
-
-        if not is_month_end:
+        if not _is_month_end(today.toordinal()):
             return False
 
         # Check if already rebalanced this month
@@ -190,27 +272,26 @@ class VolatilityRegimeStrategy(BaseStrategy):
         self.logger.info("Monthly rebalance check: Month-end")
         return True
 
-    def _check_adaptive_rebalance(self) -> bool:
+    def _check_adaptive_rebalance(self, today: datetime) -> bool:
         """
         Adaptive: Rebalance on regime change OR weekly safety check
         Combines daily regime checking with weekly safety net
         """
-        today = datetime.now()
-
-        # First check: Has regime changed since last rebalance?
-        current_regime = self.get_current_regime()
-        regime_changed = (
-                self.last_regime and
-                current_regime != self.last_regime
-        )
+        # Cheap calendar gates first - market data is only fetched if a rebalance is possible
+        if today.weekday() >= 5:
+            return False
 
-        if regime_changed:
-            # Don't rebalance twice same day
-            if self.last_rebalance_date and self.last_rebalance_date.date() == today.date():
-                return False
+        # Don't rebalance twice same day (the weekly check below needs 7+ days anyway)
+        if self.last_rebalance_date and self.last_rebalance_date.date() == today.date():
+            return False
 
-            self.logger.info(f"Adaptive trigger: Regime changed {self.last_regime} → {current_regime}")
-            return True
+        # First check: Has regime changed since last rebalance?
+        if self.last_regime:
+            self.update_market_data()
+            current_regime = self.get_current_regime()
+            if current_regime != self.last_regime:
+                self.logger.info(f"Adaptive trigger: Regime changed {self.last_regime} → {current_regime}")
+                return True
 
         # Second check: Weekly safety check (every Friday)
         if today.weekday() == 4:  # Friday
@@ -226,73 +307,178 @@ class VolatilityRegimeStrategy(BaseStrategy):
         return False
 
     def calculate_volatility(self) -> float:
-        """Calculate 20-day realized volatility (annualized)"""
-        if len(self.spy_prices) < self.vol_lookback + 1:
-            return None
-
-        prices = list(self.spy_prices)
-        returns = []
+        """Calculate 20-day realized volatility (annualized), cached until prices change"""
+        volatility, version = self._vol_cache
+        if version == self._prices_version:
+            return volatility
 
-        for i in range(1, len(prices)):
-            if prices[i] != 0:
-                daily_return = (prices[i - 1] - prices[i]) / prices[i]
-                returns.append(daily_return)
+        volatility = self._compute_volatility()
+        self._vol_cache = (volatility, self._prices_version)
+        return volatility
 
-        if len(returns) < self.vol_lookback:
+    def _compute_volatility(self) -> float:
+        if self._prices_count < self.vol_lookback + 1 or self._ret_count < self.vol_lookback:
             return None
 
-        return np.std(returns) * np.sqrt(252)
+        mean = self._ret_sum / self._ret_count
+        variance = max(0.0, self._ret_sq_sum / self._ret_count - mean * mean)
+        return math.sqrt(variance * 252)
+
+    def _append_price(self, price: float):
+        """Add a close to the window and roll the return sums forward"""
+        buf = self._prices_buf
+        capacity = buf.size
+        head = self._prices_head
+
+        if self._prices_count:
+            if self._prices_count == capacity:
+                # The return between the two oldest prices leaves the window
+                oldest, second = buf.item(head), buf.item((head + 1) % capacity)
+                if second != 0:
+                    old_ret = (oldest - second) / second
+                    self._ret_sum -= old_ret
+                    self._ret_sq_sum -= old_ret * old_ret
+                    self._ret_count -= 1
+
+            # Skip zero prices rather than dividing by them
+            if price != 0:
+                new_ret = (buf.item((head - 1) % capacity) - price) / price
+                self._ret_sum += new_ret
+                self._ret_sq_sum += new_ret * new_ret
+                self._ret_count += 1
+
+        buf[head] = price
+        self._prices_head = (head + 1) % capacity
+        self._prices_count = min(self._prices_count + 1, capacity)
+        self._prices_version += 1
+
+        # Recompute the sums exactly now and then so float drift cannot build up
+        self._appends_since_resync += 1
+        if self._appends_since_resync >= 250:
+            self._resync_return_sums()
+
+    def _replace_newest_price(self, price: float):
+        """Overwrite the newest close (a bar that was still forming) and fix up its return"""
+        if not self._prices_count:
+            self._append_price(price)
+            return
+
+        buf = self._prices_buf
+        capacity = buf.size
+        newest = (self._prices_head - 1) % capacity
+
+        if self._prices_count > 1:
+            prev, old = buf.item((newest - 1) % capacity), buf.item(newest)
+            if old != 0:
+                old_ret = (prev - old) / old
+                self._ret_sum -= old_ret
+                self._ret_sq_sum -= old_ret * old_ret
+                self._ret_count -= 1
+            if price != 0:
+                new_ret = (prev - price) / price
+                self._ret_sum += new_ret
+                self._ret_sq_sum += new_ret * new_ret
+                self._ret_count += 1
+
+        buf[newest] = price
+        self._prices_version += 1
+
+    def _load_prices(self, closes: np.ndarray):
+        """Replace the window with the newest closes in one copy and rebuild the return sums"""
+        window = closes[-self._prices_buf.size:]
+        self._prices_buf[:window.size] = window
+        self._prices_count = window.size
+        self._prices_head = window.size % self._prices_buf.size
+        self._prices_version += 1
+        self._resync_return_sums()
+
+    def _price_window(self) -> np.ndarray:
+        """Prices in the window, oldest first"""
+        if self._prices_count < self._prices_buf.size:
+            return self._prices_buf[:self._prices_count]
+        head = self._prices_head
+        return np.concatenate((self._prices_buf[head:], self._prices_buf[:head]))
+
+    def _resync_return_sums(self):
+        self._ret_sum, self._ret_sq_sum, self._ret_count = return_moments(self._price_window())
+        self._appends_since_resync = 0
 
     def update_market_data(self):
-        """Update latest prices and volatility before calculating signals"""
-        # Get latest SPY price
-        spy_df = self.data_provider.get_historical_bars('SPY', 2)
-        if not spy_df.empty:
-            latest_price = float(spy_df['close'].iloc[-1])
-            self.spy_prices.append(latest_price)
+        """
+        Update latest prices and volatility before calculating signals
+        Fetches only while today's bar is missing or still forming - a partial
+        bar is overwritten in place, a new trading day's bar is appended
+        """
+        market_now = datetime.now(_MARKET_TZ)
+        if self._needs_price_refresh(market_now):
+            self._next_price_fetch = _time.monotonic() + PRICE_REFRESH_SECONDS
+
+            # Get latest SPY bar as scalars, fall back to bars for other providers
+            if hasattr(self.data_provider, 'get_latest_bar'):
+                latest = self.data_provider.get_latest_bar('SPY')
+            else:
+                spy_bars = self.data_provider.get_bar_arrays('SPY', 2)
+                latest = (float(spy_bars['close'][-1]), int(spy_bars['ts'][-1])) if spy_bars['close'].size else None
+
+            if latest is not None:
+                price, ts = latest
+                bar_date = _market_date(ts)
+                if bar_date == self._last_price_date:
+                    self._replace_newest_price(price)
+                    self._set_last_price_date(bar_date, market_now)
+                elif self._last_price_date is None or bar_date > self._last_price_date:
+                    self._append_price(price)
+                    self._set_last_price_date(bar_date, market_now)
 
         # Recalculate volatility
         self.current_volatility = self.calculate_volatility()
 
+    def _needs_price_refresh(self, market_now: datetime) -> bool:
+        if self._last_price_final:
+            # Final close in hand - nothing newer until today's session opens
+            if self._last_price_date == market_now.date() or market_now.time() < _MARKET_OPEN:
+                return False
+        return _time.monotonic() >= self._next_price_fetch
+
+    def _set_last_price_date(self, bar_date: date, market_now: datetime):
+        """Record the newest price's trading date; it is final once that session has closed"""
+        self._last_price_date = bar_date
+        self._last_price_final = bar_date < market_now.date() or market_now.time() >= _MARKET_CLOSE
+
     def get_current_regime(self) -> str:
         """
         Determine current regime WITHOUT executing trades
         Used for regime-change detection
         """
-        # Make sure we have latest data
-        if self.current_volatility is None:
-            self.update_market_data()
-
-        if self.current_volatility is None:
-            return "UNKNOWN"
+        # Callers refresh data via update_market_data() first - this never fetches
+        return self._classify_regime(self.current_volatility)[0]
 
-        # Check recovery mode first
+    def _classify_regime(self, volatility: Optional[float]) -> Tuple[str, dict]:
+        """
+        Map volatility to (regime, allocation) - single source of truth for both
+        regime-change detection and signals; no data, then recovery mode, then normal
+        """
+        if volatility is None:
+            return self._no_data_regime
         if self.in_recovery_mode:
-            if self.current_volatility < self.vol_low_threshold * 1.5:
-                return "RECOVERY_LEVERAGE"
-            else:
-                return "RECOVERY_NEUTRAL"
+            return self._recovery_regimes[bisect_right(self._recovery_thresholds, volatility)]
+        return self._normal_regimes[bisect_right(self._normal_thresholds, volatility)]
 
-        # Normal regime detection
-        if self.current_volatility < self.vol_low_threshold:
-            return "LOW_VOL_LEVERAGE"
-        elif self.current_volatility > self.vol_high_threshold:
-            return "HIGH_VOL_DEFENSIVE"
-        else:
-            return "MEDIUM_VOL_NEUTRAL"
-
-    def check_recovery_mode(self):
+    def check_recovery_mode(self, now: Optional[datetime] = None):
         """Manage recovery mode status"""
+        if now is None:
+            now = datetime.now()
+
         # Check for extreme volatility spike (proxy for VIX panic)
         if self.current_volatility and self.current_volatility > 0.50:  # 50% = extreme
             if not self.in_recovery_mode:
                 self.in_recovery_mode = True
-                self.recovery_mode_start = datetime.now()
+                self.recovery_mode_start = now
                 self.logger.info(f"🚨 RECOVERY MODE ACTIVATED - Vol: {self.current_volatility:.1%}")
 
         # Check if should exit recovery mode
         if self.in_recovery_mode and self.recovery_mode_start:
-            days_in_recovery = (datetime.now() - self.recovery_mode_start).days
+            days_in_recovery = (now - self.recovery_mode_start).days
 
             # Exit if vol normalizes or timeout
             if (self.current_volatility and self.current_volatility < 0.20) or \
@@ -306,57 +492,40 @@ class VolatilityRegimeStrategy(BaseStrategy):
         Calculate target allocation based on volatility regime
         Returns: dict {symbol: weight}
         """
-        # Update latest market data
+        now = datetime.now()
+
+        # Update latest market data (no-op if today's close is already in)
         self.update_market_data()
 
         if self.current_volatility is None:
             self.logger.warning("Volatility not available, holding SPY")
-            allocation = {'SPY': 1.0}
-            regime = "NO_DATA_NEUTRAL"
-
         else:
             # Check recovery mode
-            self.check_recovery_mode()
+            self.check_recovery_mode(now)
 
-            # Determine allocation
-            if self.in_recovery_mode:
-                if self.current_volatility < self.vol_low_threshold * 1.5:
-                    allocation = {'UPRO': 1.0}
-                    regime = "RECOVERY_LEVERAGE"
-                else:
-                    allocation = {'SPY': 1.0}
-                    regime = "RECOVERY_NEUTRAL"
-
-            elif self.current_volatility < self.vol_low_threshold:
-                allocation = {'UPRO': 1.0}
-                regime = "LOW_VOL_LEVERAGE"
-
-            elif self.current_volatility > self.vol_high_threshold:
-                allocation = {'SH': 1.0}
-                regime = "HIGH_VOL_DEFENSIVE"
-
-            else:
-                allocation = {'SPY': 1.0}
-                regime = "MEDIUM_VOL_NEUTRAL"
+        # Determine allocation (copy - the table entries are shared)
+        regime, allocation = self._classify_regime(self.current_volatility)
+        allocation = dict(allocation)
 
         # Log decision
         allocation_str = ", ".join([f"{sym}: {w:.0%}" for sym, w in allocation.items()])
+        vol_str = f"{self.current_volatility:.1%}" if self.current_volatility is not None else "n/a"
         self.logger.info(
-            f"📊 {regime} | {allocation_str} | Vol: {self.current_volatility:.1%} | "
+            f"📊 {regime} | {allocation_str} | Vol: {vol_str} | "
             f"Frequency: {self.rebalance_frequency}"
         )
 
         # Update state BEFORE executing trades (crash-safe)
         self.trade_count += 1
-        self.last_rebalance_date = datetime.now()
+        self.last_rebalance_date = now
         self.last_regime = regime
 
         self.save_state({
-            'last_rebalance_date': self.last_rebalance_date.isoformat(),
+            'last_rebalance_date': self._last_rebalance_date_iso,
             'last_regime': self.last_regime,
             'trade_count': self.trade_count,
             'in_recovery_mode': self.in_recovery_mode,
-            'recovery_mode_start': self.recovery_mode_start.isoformat() if self.recovery_mode_start else None,
+            'recovery_mode_start': self._recovery_mode_start_iso,
         })
 
         return allocation
\ No newline at end of file
@@ -0,0 +1,116 @@
+# tests/test_alpaca_broker.py
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+from alpaca.common.exceptions import APIError
+
+from shared.alpaca_broker import AlpacaBroker
+
+
+def _api_error(status_code: int) -> APIError:
+    response = SimpleNamespace(status_code=status_code, headers={})
+    return APIError('{"code": %d, "message": "test"}' % status_code, SimpleNamespace(response=response))
+
+
+class FakeTradingClient:
+    """Raises the queued errors in order, then returns an account"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+    def get_account(self):
+        self._call()
+        return SimpleNamespace(equity='1000.5')
+
+    def close_position(self, symbol):
+        self._call()
+        return SimpleNamespace(symbol=symbol)
+
+
+def _broker(trading_client) -> AlpacaBroker:
+    # Skip __init__ - it connects to Alpaca
+    broker = AlpacaBroker.__new__(AlpacaBroker)
+    broker.logger = logging.getLogger("test-broker")
+    broker.trading_client = trading_client
+    broker._ttl_cache = {}
+    broker._ttl_lock = threading.Lock()
+    return broker
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr('shared.alpaca_broker.time.sleep', delays.append)
+    return delays
+
+
+@pytest.mark.parametrize('status_code', [429, 503])
+def test_retry_recovers_from_transient_errors(sleeps, status_code):
+    client = FakeTradingClient([_api_error(status_code), _api_error(status_code)])
+    broker = _broker(client)
+
+    assert broker._retry(client.get_account).equity == '1000.5'
+    assert client.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_raises_not_found_immediately(sleeps):
+    client = FakeTradingClient([_api_error(404)])
+    broker = _broker(client)
+
+    with pytest.raises(APIError):
+        broker._retry(client.get_account)
+    assert client.calls == 1
+    assert sleeps == []
+
+
+def test_retry_gives_up_after_retries(sleeps):
+    client = FakeTradingClient([_api_error(503)] * 3)
+    broker = _broker(client)
+
+    with pytest.raises(APIError):
+        broker._retry(client.get_account, retries=2)
+    assert client.calls == 3
+
+
+def test_ttl_cached_reuses_and_invalidates(sleeps):
+    client = FakeTradingClient()
+    broker = _broker(client)
+
+    assert broker.get_equity() == 1000.5
+    assert broker.get_account().equity == '1000.5'
+    assert client.calls == 1
+
+    broker._invalidate('_get_cached_account')
+    broker.get_equity()
+    assert client.calls == 2
+
+
+def test_ttl_cached_does_not_cache_errors(sleeps):
+    client = FakeTradingClient([_api_error(404)])
+    broker = _broker(client)
+
+    with pytest.raises(APIError):
+        broker.get_equity()
+    assert broker.get_equity() == 1000.5
+
+
+def test_close_position_not_found_means_no_position(sleeps):
+    broker = _broker(FakeTradingClient([_api_error(404)]))
+
+    assert broker._close_position('SPY') is False
+
+
+def test_close_position_not_found_after_retry_waits_for_closure(sleeps):
+    # First attempt reached the server but answered 502 - the retry then finds no position
+    broker = _broker(FakeTradingClient([_api_error(502), _api_error(404)]))
+
+    assert broker._close_position('SPY') is True
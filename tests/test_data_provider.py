@@ -0,0 +1,84 @@
+# tests/test_data_provider.py
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import shared.data_provider as data_provider_module
+from shared.data_provider import DataProvider
+
+
+class FakeBarsResponse:
+    def __init__(self, df):
+        self.df = df
+
+
+class FakeDataClient:
+    """Returns one daily bar per weekday in [start, end], timestamped like Alpaca (04:00 UTC)"""
+
+    def __init__(self):
+        self.starts = []
+
+    def get_stock_bars(self, request):
+        start, end = request.start, request.end
+        self.starts.append(start)
+        days = pd.bdate_range(start.date(), end.date())
+        days = days[days >= pd.Timestamp(start)]  # Alpaca returns only bars at or after start
+        rows = []
+        for symbol in request.symbol_or_symbols:
+            for day in days:
+                ts = pd.Timestamp(day.date(), tz='UTC') + pd.Timedelta(hours=4)
+                rows.append((symbol, ts, 100.0, 101.0, 99.0, 100.5, 1000))
+        df = pd.DataFrame(rows, columns=['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        return FakeBarsResponse(df.set_index(['symbol', 'timestamp']))
+
+
+def _freeze_clock(monkeypatch, now: datetime):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(data_provider_module, 'datetime', FrozenDatetime)
+
+
+def _provider(cache_dir) -> DataProvider:
+    provider = DataProvider('key', 'secret', cache_dir=str(cache_dir))
+    provider.client = FakeDataClient()
+    return provider
+
+
+@pytest.fixture
+def first_run(tmp_path, monkeypatch):
+    # Thursday morning - the window start (now - 40 days) falls on a Saturday
+    _freeze_clock(monkeypatch, datetime(2026, 10, 15, 10, 0))
+    provider = _provider(tmp_path)
+    provider.get_historical_bars('SPY', 30)
+    assert len(provider.client.starts) == 1
+    return tmp_path
+
+
+def test_same_day_restart_fetches_only_new_bars(first_run):
+    provider = _provider(first_run)
+    df = provider.get_historical_bars('SPY', 30)
+
+    # Last persisted bar is yesterday's - today's was still forming
+    assert provider.client.starts == [datetime(2026, 10, 15)]
+    assert df.index[-1].date() == datetime(2026, 10, 15).date()
+    assert df.index[0].date() >= (datetime(2026, 10, 15) - timedelta(days=40)).date()
+
+
+def test_next_day_fetches_only_new_bars(first_run, monkeypatch):
+    _freeze_clock(monkeypatch, datetime(2026, 10, 16, 10, 0))
+    provider = _provider(first_run)
+    df = provider.get_historical_bars('SPY', 30)
+
+    assert provider.client.starts == [datetime(2026, 10, 15)]
+    assert df.index[-1].date() == datetime(2026, 10, 16).date()
+
+
+def test_longer_window_triggers_full_fetch(first_run):
+    provider = _provider(first_run)
+    provider.get_historical_bars('SPY', 60)
+
+    assert provider.client.starts == [datetime(2026, 10, 15, 10, 0) - timedelta(days=70)]
@@ -0,0 +1,58 @@
+# tests/test_market_calendar.py
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from shared.market_calendar import MarketCalendar
+
+THANKSGIVING = date(2026, 11, 26)
+
+
+class FakeCalendarClient:
+    """Weekday sessions in the requested range, minus one holiday"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_calendar(self, request):
+        self.requests.append((request.start, request.end))
+        day, sessions = request.start, []
+        while day <= request.end:
+            if day.weekday() < 5 and day != THANKSGIVING:
+                sessions.append(SimpleNamespace(date=day))
+            day += timedelta(days=1)
+        return sessions
+
+
+def _calendar() -> MarketCalendar:
+    calendar = MarketCalendar()
+    calendar._trading_client = FakeCalendarClient()
+    return calendar
+
+
+def test_far_lookup_extends_instead_of_replacing():
+    calendar = _calendar()
+    client = calendar._trading_client
+
+    assert calendar.is_trading_day(date(2026, 10, 15))
+    first_end = calendar._trading_days_range[1]
+
+    assert calendar.is_trading_day(date(2030, 1, 2))
+    assert client.requests[1][0] == first_end + timedelta(days=1)
+
+    # Sessions around today survive the far lookup - no refetch, holiday still known
+    assert calendar.is_trading_day(date(2026, 10, 16))
+    assert not calendar.is_trading_day(THANKSGIVING)
+    assert len(client.requests) == 2
+
+
+def test_earlier_lookup_extends_backwards():
+    calendar = _calendar()
+    client = calendar._trading_client
+
+    calendar.is_trading_day(date(2026, 10, 15))
+    first_start = calendar._trading_days_range[0]
+
+    assert not calendar.is_trading_day(date(2026, 1, 3))  # Saturday
+    assert client.requests[1][1] == first_start - timedelta(days=1)
+    assert calendar.is_trading_day(date(2026, 10, 15))
+    assert len(client.requests) == 2
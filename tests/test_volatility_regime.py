@@ -0,0 +1,51 @@
+# tests/test_volatility_regime.py
+import numpy as np
+import pytest
+
+from strategies.volatility_regime import VolatilityRegimeStrategy
+
+
+def _reference_volatility(prices: list, lookback: int) -> float:
+    """The exact calculation the rolling sums replaced: np.std of the window's daily returns"""
+    window = np.array(prices[-(lookback + 1):])
+    returns = (window[:-1] - window[1:]) / window[1:]
+    return float(np.std(returns) * np.sqrt(252))
+
+
+@pytest.fixture
+def strategy(tmp_path, monkeypatch):
+    monkeypatch.setenv('STATE_DIR', str(tmp_path))
+    return VolatilityRegimeStrategy(broker=None, data_provider=None, rebalance_frequency='daily')
+
+
+def test_rolling_volatility_matches_exact_std(strategy):
+    rng = np.random.default_rng(42)
+    prices = (400.0 * np.exp(np.cumsum(rng.normal(0.0, 0.015, 900)))).tolist()
+
+    seen = []
+    for i, price in enumerate(prices):
+        if i % 7 == 3:
+            # Intraday partial bar first, overwritten by the final close
+            strategy._append_price(price * (1 + rng.normal(0.0, 0.01)))
+            strategy._replace_newest_price(price)
+        else:
+            strategy._append_price(price)
+        seen.append(price)
+
+        volatility = strategy.calculate_volatility()
+        if len(seen) <= strategy.vol_lookback:
+            assert volatility is None
+        else:
+            assert volatility == pytest.approx(_reference_volatility(seen, strategy.vol_lookback), rel=1e-9)
+
+
+def test_load_prices_then_append_matches_exact_std(strategy):
+    rng = np.random.default_rng(7)
+    prices = (400.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, 300)))).tolist()
+
+    strategy._load_prices(np.array(prices[:25]))
+    for price in prices[25:]:
+        strategy._append_price(price)
+
+    assert strategy.calculate_volatility() == pytest.approx(
+        _reference_volatility(prices, strategy.vol_lookback), rel=1e-9)